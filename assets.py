@@ -0,0 +1,138 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Central loader for the game images and sounds.
+Each file is loaded once when first used and images are converted to the
+display pixel format once the display has been created so blits do not need
+to convert every pixel.
+pygame itself is only imported when the first asset is loaded so the game
+logic can be imported quickly and without a display or audio device.
+The sound effects can be decoded on a background thread while the window
+is shown and the music is streamed from its file as it plays rather than
+decoded into memory.
+Files are found from the game folder so the tools can be run from any directory.
+"""
+
+import os
+import threading
+
+# Folder holding the images and sounds folders
+game_folder = os.path.dirname(os.path.abspath(__file__))
+
+# Converted images keyed by file name
+converted_images = {}
+# Images loaded before the display was created
+loaded_images = {}
+# Sounds keyed by file name
+sounds = {}
+# Sound effects played by the game - decoded by load_sounds
+sound_files = ['eatEnergiser.wav', 'eatghost.wav', 'extraLife.wav', 'GameOver.wav',
+               'LevelCompleted.wav', 'lifeLost.wav']
+# Held while a sound is decoded so a sound is only decoded once
+sound_lock = threading.Lock()
+# Thread decoding the sounds - None if not started
+sound_loader = None
+# Fonts keyed by (name, size, bold, italic)
+fonts = {}
+
+
+def asset_path(folder, name):
+    # Path of a file in the images or sounds folder
+    return os.path.join(game_folder, folder, name)
+
+
+def image(name):
+    # Return the image from the images folder
+    img = converted_images.get(name)
+    if img is not None:
+        return img
+    import pygame
+    img = loaded_images.get(name)
+    if img is None:
+        img = pygame.image.load(asset_path('images', name))
+    if pygame.display.get_surface() is None:
+        # Cannot convert until the display exists
+        loaded_images[name] = img
+        return img
+    if img.get_flags() & pygame.SRCALPHA:
+        # keep the transparency of images saved with an alpha channel
+        img = img.convert_alpha()
+    else:
+        # opaque sprites are blitted as a straight copy
+        img = img.convert()
+    loaded_images.pop(name, None)
+    converted_images[name] = img
+    return img
+
+
+def sound(name):
+    # Return the sound from the sounds folder or None if there is no audio device
+    snd = sounds.get(name)
+    if snd is None:
+        import pygame
+        if not pygame.mixer.get_init():
+            return None
+        with sound_lock:
+            snd = sounds.get(name)
+            if snd is None:
+                snd = pygame.mixer.Sound(asset_path('sounds', name))
+                sounds[name] = snd
+    return snd
+
+
+def load_sounds(names):
+    # Start decoding the sounds on a background thread - sounds_ready() is True when done
+    global sound_loader
+    if sound_loader is None:
+        sound_loader = threading.Thread(target=decode_sounds, args=(list(names),), daemon=True)
+        sound_loader.start()
+
+
+def decode_sounds(names):
+    for name in names:
+        sound(name)
+
+
+def sounds_ready():
+    # True once the sounds started by load_sounds have been decoded
+    return sound_loader is None or not sound_loader.is_alive()
+
+
+def load_music(name, volume):
+    # Open the music in the sounds folder ready to play - it is decoded a little at a time as it plays
+    import pygame
+    if pygame.mixer.get_init():
+        pygame.mixer.music.load(asset_path('sounds', name))
+        pygame.mixer.music.set_volume(volume)
+
+
+def play_music():
+    # Play the music loaded by load_music repeatedly
+    import pygame
+    if pygame.mixer.get_init():
+        pygame.mixer.music.play(-1)
+
+
+def stop_music():
+    import pygame
+    if pygame.mixer.get_init():
+        pygame.mixer.music.stop()
+
+
+def font(name, size, bold=False, italic=False):
+    # Return the system font - looking up system fonts is slow so each is created once
+    key = (name, size, bold, italic)
+    fnt = fonts.get(key)
+    if fnt is None:
+        import pygame
+        if not pygame.font.get_init():
+            pygame.font.init()
+        fnt = pygame.font.SysFont(name, size, bold, italic)
+        fonts[key] = fnt
+    return fnt
+
+
+def play_sound(name):
+    snd = sound(name)
+    if snd is not None:
+        snd.play()
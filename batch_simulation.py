@@ -0,0 +1,697 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+BatchSimulation class - runs many independent games in lockstep with the
+state of every game held in NumPy arrays so each frame is a few array
+operations rather than a Python loop per game. Follows the same rules as
+GameState.update and gives the same results for the same player directions
+and random seeds. Requires NumPy.
+"""
+
+import random
+import numpy as np
+from constants import *
+from maze_grids import maze_layouts
+from pac_man import player_max_speed, caught_timer_default
+from dot import DOT, ENERGISER, dot_score, fruit_score
+from ghost import *
+from path_map import get_path_map, path_directions, UNREACHABLE
+from wall_map import X_OFFSET, Y_OFFSET
+
+# Grid cell types held in the layout tables
+EMPTY = 0
+SMALL_DOT = 1
+BIG_DOT = 2
+
+# Number of ghosts in each game
+GHOSTS = 4
+
+
+def compile_layout(maze):
+    """
+    Convert a maze layout into the tables used by the batch simulation
+    :param maze: list of strings from maze_layouts
+    :return: dict of walls, dot cells, start positions and ghost types
+    """
+    rows = len(maze)
+    columns = max(len(row) for row in maze)
+    walls = np.zeros((rows, columns), dtype=bool)
+    cells = np.zeros((rows, columns), dtype=np.int8)
+    ghost_types = []
+    ghost_starts = []
+    pacman_start = (0, 0)
+    fruit_position = (0, 0)
+    ghost_chars = {"B": BLINKY, "I": INKY, "P": PINKY, "C": CLYDE}
+    for y, row in enumerate(maze):
+        for x, char in enumerate(row):
+            if char == "X" or char == "O":
+                walls[y, x] = True
+            elif char == ".":
+                cells[y, x] = SMALL_DOT
+            elif char == "E":
+                cells[y, x] = BIG_DOT
+            elif char == "Y":
+                pacman_start = (x * 20 + 10, y * 20 + 40)
+            elif char == "F":
+                fruit_position = (x * 20 + 20 - 10, y * 20 + 40)
+            elif char in ghost_chars:
+                gtype = ghost_chars[char]
+                gx = x * 20 + 20
+                if gtype == BLINKY:
+                    gx -= 10
+                ghost_types.append(gtype)
+                ghost_starts.append((gx, y * 20 + 40))
+    exit_point = ghost_starts[ghost_types.index(BLINKY)]
+    return {
+        "walls": walls,
+        "cells": cells,
+        "ghost_types": ghost_types,
+        "ghost_starts": ghost_starts,
+        "exit_point": exit_point,
+        "pacman_start": pacman_start,
+        "fruit_position": fruit_position,
+    }
+
+
+def snap_to_grid(pos, speed):
+    # Array version of game_state.snap_to_grid
+    ipos = np.round(pos)
+    dist = pos - ipos // 20 * 20
+    forward = dist >= 20 - speed / 1.5
+    back = dist <= speed / 1.5
+    return np.where(forward, ipos + 20 - ipos % 20,
+                    np.where(back, ipos - ipos % 20, pos))
+
+
+def reverse_of(direction):
+    # The reverse of each direction - HOLD and DOWN reverse to UP as in Ghost.reverse_direction
+    return np.select([direction == LEFT, direction == RIGHT, direction == UP],
+                     [RIGHT, LEFT, DOWN], UP)
+
+
+class BatchSimulation:
+    def __init__(self, games, seeds=None):
+        """
+        :param games: number of games to run in lockstep
+        :param seeds: random seed for each game as passed to GameState.new_game - used for
+        Clyde and frightened ghost targets
+        """
+        self.games = games
+        if seeds is None:
+            seeds = range(games)
+        self.random = [random.Random(seed) for seed in seeds]
+        layouts = [compile_layout(maze) for maze in maze_layouts]
+        self.layouts = layouts
+        # Tables for every layout indexed by the layout number of each game
+        self.layout_walls = np.stack([layout["walls"] for layout in layouts])
+        self.layout_cells = np.stack([layout["cells"] for layout in layouts])
+        self.layout_ghost_types = np.array([layout["ghost_types"] for layout in layouts])
+        self.layout_ghost_starts = np.array([layout["ghost_starts"] for layout in layouts], dtype=float)
+        self.layout_exit_points = np.array([layout["exit_point"] for layout in layouts], dtype=float)
+        self.layout_pacman_starts = np.array([layout["pacman_start"] for layout in layouts], dtype=float)
+        self.layout_fruit_positions = np.array([layout["fruit_position"] for layout in layouts], dtype=float)
+        self.rows, self.columns = self.layout_walls.shape[1:]
+        # flattened copy so a wall lookup is a single index
+        self.cells_per_layout = self.rows * self.columns
+        self.flat_walls = self.layout_walls.ravel()
+        # shortest route tables from the path map of each layout
+        # distances are indexed by layout, target cell and cell
+        paths = [get_path_map(index, maze) for index, maze in enumerate(maze_layouts)]
+        self.path_open = np.array([path_map.open for path_map in paths])
+        self.path_nearest = np.array([path_map.nearest for path_map in paths])
+        self.path_neighbours = np.full((len(paths), self.cells_per_layout, 4), -1, dtype=np.int64)
+        self.path_distances = np.full((len(paths), self.cells_per_layout, self.cells_per_layout),
+                                      UNREACHABLE, dtype=np.int16)
+        for index, path_map in enumerate(paths):
+            for cell, ways in enumerate(path_map.neighbours):
+                for direction, next_cell in ways:
+                    self.path_neighbours[index, cell, path_directions.index(direction)] = next_cell
+                if path_map.open[cell]:
+                    self.path_distances[index, cell] = path_map.distances(cell)
+
+        n = games
+        # Game
+        self.score = np.zeros(n, dtype=np.int64)
+        self.level = np.ones(n, dtype=np.int64)
+        self.lives = np.zeros(n, dtype=np.int64)
+        self.lives_lost = np.zeros(n, dtype=np.int64)
+        self.game_over = np.zeros(n, dtype=bool)
+        self.layout = np.zeros(n, dtype=np.int64)
+        self.dots_eaten = np.zeros(n, dtype=np.int64)
+        self.scatter_count = np.zeros(n, dtype=np.int64)
+        self.ghosts_eaten = np.zeros(n, dtype=np.int64)
+        self.chase_timer = np.zeros(n)
+        self.scatter_timer = np.zeros(n)
+        self.mode_timer = np.zeros(n)
+        self.fright_length = np.zeros(n)
+        self.fright_timer = np.zeros(n)
+        self.new_life_target = np.zeros(n, dtype=np.int64)
+        self.current_ghost_mode = np.zeros(n, dtype=np.int64)
+        self.level_cleared = np.zeros(n, dtype=bool)
+        self.end_of_level_timer = np.zeros(n, dtype=np.int64)
+        self.next_direction = np.zeros(n, dtype=np.int64)
+        self.frames = np.zeros(n, dtype=np.int64)
+        # Dots and energisers still to be eaten
+        self.dots = np.zeros((n, self.rows, self.columns), dtype=bool)
+        self.energisers = np.zeros((n, self.rows, self.columns), dtype=bool)
+        self.dots_left = np.zeros(n, dtype=np.int64)
+        # Bonus fruit - at most one is displayed at a time
+        self.fruit_shown = np.zeros(n, dtype=bool)
+        self.fruit_done = np.zeros(n, dtype=bool)
+        self.fruit_timer = np.zeros(n, dtype=np.int64)
+        self.fruit_x = np.zeros(n)
+        self.fruit_y = np.zeros(n)
+        # Pac-Man
+        self.pacman_x = np.zeros(n)
+        self.pacman_y = np.zeros(n)
+        self.pacman_speed = np.zeros(n)
+        self.pacman_speed_for_level = np.zeros(n)
+        self.pacman_direction = np.zeros(n, dtype=np.int64)
+        self.pacman_caught = np.zeros(n, dtype=bool)
+        self.pacman_done = np.zeros(n, dtype=bool)
+        self.caught_timer = np.zeros(n, dtype=np.int64)
+        self.pacman_start_x = np.zeros(n)
+        self.pacman_start_y = np.zeros(n)
+        # Ghosts - one column per ghost in the order they appear in the maze
+        shape = (n, GHOSTS)
+        self.ghost_type = np.zeros(shape, dtype=np.int64)
+        self.ghost_x = np.zeros(shape)
+        self.ghost_y = np.zeros(shape)
+        self.ghost_start_x = np.zeros(shape)
+        self.ghost_start_y = np.zeros(shape)
+        self.exit_x = np.zeros((n, 1))
+        self.exit_y = np.zeros((n, 1))
+        self.ghost_speed = np.zeros(shape)
+        self.ghost_speed_for_level = np.zeros(shape)
+        self.target_x = np.zeros(shape)
+        self.target_y = np.zeros(shape)
+        self.ghost_mode = np.zeros(shape, dtype=np.int64)
+        self.ghost_direction = np.zeros(shape, dtype=np.int64)
+        self.delay = np.zeros(shape, dtype=np.int64)
+        self.random_timer = np.zeros(shape, dtype=np.int64)
+
+        self.new_game(np.ones(n, dtype=bool))
+
+    def new_game(self, mask):
+        # Set defaults for a new game in play for the selected games
+        self.score[mask] = 0
+        self.level[mask] = 1
+        self.lives[mask] = START_LIVES
+        self.lives_lost[mask] = 0
+        self.game_over[mask] = False
+        self.frames[mask] = 0
+        self.set_for_level(mask)
+        # reset timers
+        self.chase_timer[mask] = CHASE_TIMER
+        self.scatter_timer[mask] = SCATTER_TIMER
+        self.fright_length[mask] = FRIGHT_TIMER
+        self.new_life_target[mask] = NEW_LIFE_INTERVAL
+
+    def set_for_level(self, mask):
+        # reset the board for the selected games at the start of a level
+        layout = (self.level - 1) % len(self.layouts)
+        self.layout[mask] = layout[mask]
+        layout = layout[mask]
+        self.next_direction[mask] = HOLD
+        self.scatter_count[mask] = 0
+        self.ghosts_eaten[mask] = 0
+        self.dots_eaten[mask] = 0
+        self.level_cleared[mask] = False
+        cells = self.layout_cells[layout]
+        self.dots[mask] = cells == SMALL_DOT
+        self.energisers[mask] = cells == BIG_DOT
+        self.dots_left[mask] = np.count_nonzero(cells, axis=(1, 2))
+        self.fruit_shown[mask] = False
+        self.fruit_done[mask] = False
+        self.fruit_x[mask] = self.layout_fruit_positions[layout, 0]
+        self.fruit_y[mask] = self.layout_fruit_positions[layout, 1]
+        # new Pac-Man
+        self.pacman_start_x[mask] = self.layout_pacman_starts[layout, 0]
+        self.pacman_start_y[mask] = self.layout_pacman_starts[layout, 1]
+        self.pacman_x[mask] = self.pacman_start_x[mask]
+        self.pacman_y[mask] = self.pacman_start_y[mask]
+        self.pacman_direction[mask] = HOLD
+        self.pacman_caught[mask] = False
+        self.pacman_done[mask] = False
+        self.caught_timer[mask] = 0
+        # new ghosts
+        self.ghost_type[mask] = self.layout_ghost_types[layout]
+        self.ghost_start_x[mask] = self.layout_ghost_starts[layout, :, 0]
+        self.ghost_start_y[mask] = self.layout_ghost_starts[layout, :, 1]
+        self.ghost_x[mask] = self.ghost_start_x[mask]
+        self.ghost_y[mask] = self.ghost_start_y[mask]
+        self.exit_x[mask, 0] = self.layout_exit_points[layout, 0]
+        self.exit_y[mask, 0] = self.layout_exit_points[layout, 1]
+        self.target_x[mask] = 400
+        self.target_y[mask] = 600
+        self.ghost_mode[mask] = np.where(self.ghost_type[mask] == CLYDE, RANDOM, CHASE)
+        self.ghost_direction[mask] = HOLD
+        self.delay[mask] = np.array(delay_to_release)[self.ghost_type[mask]]
+        self.random_timer[mask] = random_interval
+        self.current_ghost_mode[mask] = CHASE
+        self.mode_timer[mask] = CHASE_TIMER
+        # set pacman and ghost speed for level slow down for first 5 levels
+        percent = np.where(self.level < 6, 100 - (6 - self.level) * 5, 100)[mask]
+        pacman_speed = np.where(percent < 100, player_max_speed * percent / 100, player_max_speed)
+        ghost_speed = np.where(percent < 100, ghost_mex_speed * percent / 100, ghost_mex_speed)
+        self.pacman_speed[mask] = pacman_speed
+        self.pacman_speed_for_level[mask] = pacman_speed
+        self.ghost_speed[mask] = ghost_speed[:, None]
+        self.ghost_speed_for_level[mask] = ghost_speed[:, None]
+
+    def find_wall(self, x, y, layout):
+        """
+        Array version of WallMap.find_collision for 20x20 sprites
+        A sprite overlaps at most 2 cells each way so only a 3x3 block is tested
+        :return: hit mask and the center of the first wall hit
+        """
+        x = np.abs(x)
+        y = np.abs(y)
+        first_col = ((x - 40) // 20).astype(np.int64)
+        first_row = ((y - 60) // 20).astype(np.int64)
+        hit = np.zeros(x.shape, dtype=bool)
+        wall_x = np.zeros(x.shape)
+        wall_y = np.zeros(x.shape)
+        for i in range(3):
+            row = first_row + i
+            centre_y = row * 20 + 40
+            row_ok = (row >= 0) & (row < self.rows) & (np.abs(y - centre_y) < 20)
+            if not row_ok.any():
+                continue
+            base = layout * self.cells_per_layout + np.where(row_ok, row, 0) * self.columns
+            for j in range(3):
+                col = first_col + j
+                centre_x = col * 20 + 20
+                ok = row_ok & (col >= 0) & (col < self.columns) & (np.abs(x - centre_x) < 20)
+                ok &= self.flat_walls[base + np.where(ok, col, 0)]
+                new = ok & ~hit
+                wall_x[new] = centre_x[new]
+                wall_y[new] = centre_y[new]
+                hit |= ok
+        return hit, wall_x, wall_y
+
+    def try_to_move(self, direction, x, y, speed, current, mask, layout):
+        """
+        Array version of GameState.try_to_move - only the masked entries are changed
+        :return: new x, y, current direction and True where the move succeeded
+        """
+        x = x.copy()
+        y = y.copy()
+        current = current.copy()
+        mask = np.broadcast_to(mask, x.shape)
+        moved = np.zeros(x.shape, dtype=bool)
+        index = np.nonzero(mask)
+        if len(index[0]) == 0:
+            return x, y, current, moved
+        # work on the masked entries only
+        direction = np.broadcast_to(direction, x.shape)[index]
+        speed = np.broadcast_to(speed, x.shape)[index]
+        layout = np.broadcast_to(layout, x.shape)[index]
+        was = current[index]
+        sx = x[index]
+        sy = y[index]
+        turning = direction != was
+        if turning.any():
+            sx[turning] = snap_to_grid(sx[turning], speed[turning])
+            sy[turning] = snap_to_grid(sy[turning], speed[turning])
+        across = (direction == LEFT) | (direction == RIGHT)
+        sx += np.select([direction == RIGHT, direction == LEFT], [speed, -speed], 0)
+        sy += np.select([direction == DOWN, direction == UP], [speed, -speed], 0)
+        hit, wall_x, wall_y = self.find_wall(sx, sy, layout)
+        sx = np.where(hit & across, np.where(sx % 20 > 10, wall_x + 20, wall_x - 20), sx)
+        sy = np.where(hit & ~across, np.where(sy % 20 > 10, wall_y + 20, wall_y - 20), sy)
+        x[index] = sx
+        y[index] = sy
+        current[index] = np.where(hit, was, direction)
+        moved[index] = ~hit
+        return x, y, current, moved
+
+    @staticmethod
+    def wrap(x, mask):
+        # Check if exiting screen left or right
+        x = np.where(mask & (x < 2), WIDTH - 22, x)
+        return np.where(mask & (x > WIDTH - 22), 2, x)
+
+    def increase_score(self, points, mask):
+        # increase the score and add a new life if target reached
+        self.score += np.where(mask, points, 0)
+        target = mask & (self.score >= self.new_life_target)
+        self.new_life_target[target] += NEW_LIFE_INTERVAL
+        self.lives[target & (self.lives < 5)] += 1
+
+    def set_default_mode(self, mask):
+        # mask is per ghost - Ghost.set_default_mode(False)
+        change = mask & (self.ghost_mode != CAUGHT)
+        self.ghost_mode = np.where(change, np.where(self.ghost_type == CLYDE, RANDOM, CHASE), self.ghost_mode)
+        self.ghost_speed = np.where(change, self.ghost_speed_for_level, self.ghost_speed)
+
+    def ghost_fright_over(self, mask):
+        # fright mode over - return to ghosts default state
+        self.ghosts_eaten[mask] = 0
+        self.set_default_mode(mask[:, None])
+        self.mode_timer[mask] = self.chase_timer[mask]
+
+    def change_ghost_mode(self, mask):
+        # called when timer expired to change ghost mode
+        scatter = mask & (self.scatter_count < 3) & (self.current_ghost_mode == CHASE)
+        self.scatter_count[scatter] += 1
+        self.current_ghost_mode[scatter] = SCATTER
+        self.mode_timer[scatter] = self.scatter_timer[scatter]
+        change = scatter[:, None] & (self.ghost_mode != CAUGHT)
+        self.ghost_mode = np.where(change, SCATTER, self.ghost_mode)
+        self.ghost_direction = np.where(change, reverse_of(self.ghost_direction), self.ghost_direction)
+        chase = mask & ~scatter
+        self.current_ghost_mode[chase] = CHASE
+        self.mode_timer[chase] = self.chase_timer[chase]
+        self.set_default_mode(chase[:, None])
+
+    def eat(self, points, mask, energiser=None):
+        # Pac-Man has eaten a dot, energiser or fruit in the masked games
+        self.increase_score(points, mask)
+        self.dots_eaten[mask] += 1
+        # reduce delay to release for penned ghosts
+        self.delay = np.where(mask[:, None] & (self.delay > 0), self.delay - 1, self.delay)
+        if energiser is not None and energiser.any():
+            # put ghosts in fright mode
+            frighten = energiser[:, None]
+            self.ghost_mode = np.where(frighten, FRIGHTENED, self.ghost_mode)
+            self.ghost_direction = np.where(frighten, reverse_of(self.ghost_direction), self.ghost_direction)
+            self.ghost_speed = np.where(frighten, self.ghost_speed * 0.66, self.ghost_speed)
+            self.fright_timer[energiser] = self.fright_length[energiser]
+        # check if fruit to be displayed
+        fruit = mask & ((self.dots_eaten == 70) | (self.dots_eaten == 170))
+        self.fruit_shown[fruit] = True
+        self.fruit_done[fruit] = False
+        self.fruit_timer[fruit] = DISPLAY_FRUIT
+        return fruit
+
+    def set_direction(self, mask):
+        # Array version of Ghost.set_dirction for all ghosts in the masked games
+        pacman_x = self.pacman_x[:, None]
+        pacman_y = self.pacman_y[:, None]
+        pacman_direction = self.pacman_direction[:, None]
+        gtype = self.ghost_type
+        mode = self.ghost_mode
+        active = mask[:, None] & (self.delay <= 0)
+        # If currently hold then in the pen so position ghost outside the pen
+        leave = active & (self.ghost_direction == HOLD)
+        self.ghost_x = np.where(leave, self.exit_x, self.ghost_x)
+        self.ghost_y = np.where(leave, self.exit_y, self.ghost_y)
+        target_x = self.target_x
+        target_y = self.target_y
+        # Chase mode targets
+        chase = active & (mode == CHASE)
+        ahead_x = np.select([(pacman_direction == LEFT) | (pacman_direction == HOLD), pacman_direction == RIGHT],
+                            [pacman_x - 80, pacman_x + 80], pacman_x)
+        ahead_y = np.select([pacman_direction == UP, pacman_direction == DOWN],
+                            [pacman_y - 80, pacman_y + 80], pacman_y)
+        behind_x = np.select([(pacman_direction == LEFT) | (pacman_direction == HOLD), pacman_direction == RIGHT],
+                             [pacman_x + 80, pacman_x - 80], pacman_x)
+        behind_y = np.select([pacman_direction == UP, pacman_direction == DOWN],
+                             [pacman_y + 80, pacman_y - 80], pacman_y)
+        chase_x = np.select([gtype == PINKY, gtype == INKY], [ahead_x, behind_x], pacman_x)
+        chase_y = np.select([gtype == PINKY, gtype == INKY], [ahead_y, behind_y], pacman_y)
+        target_x = np.where(chase, chase_x, target_x)
+        target_y = np.where(chase, chase_y, target_y)
+        # Scatter mode targets the corner for each ghost
+        scatter = active & (mode == SCATTER)
+        corner_x = np.array([-200, WIDTH + 200, -200, WIDTH + 200])[gtype]
+        corner_y = np.array([-100, -100, HEIGHT + 250, HEIGHT + 250])[gtype]
+        target_x = np.where(scatter, corner_x, target_x)
+        target_y = np.where(scatter, corner_y, target_y)
+        # Random and frightened move to a random target at each interval
+        wander = active & ((mode == RANDOM) | (mode == FRIGHTENED))
+        self.random_timer = np.where(wander, self.random_timer + 1, self.random_timer)
+        new_target = wander & (self.random_timer >= random_interval - 1)
+        if new_target.any():
+            target_x = target_x.copy()
+            target_y = target_y.copy()
+            for game, ghost in zip(*np.nonzero(new_target)):
+                rng = self.random[game]
+                target_x[game, ghost] = rng.randint(0, WIDTH - 1)
+                target_y[game, ghost] = rng.randint(0, HEIGHT - 1)
+            self.random_timer[new_target] = 0
+        # Caught ghosts return to the pen
+        caught = active & (mode == CAUGHT)
+        home = caught & (np.abs(self.exit_x - self.ghost_x) < 20) & (np.abs(self.exit_y - self.ghost_y) < 20)
+        if home.any():
+            self.ghost_x = np.where(home, self.ghost_start_x, self.ghost_x)
+            self.ghost_y = np.where(home, self.ghost_start_y, self.ghost_y)
+            self.ghost_mode = np.where(home, np.where(gtype == CLYDE, RANDOM, CHASE), self.ghost_mode)
+            self.ghost_speed = np.where(home, self.ghost_speed_for_level, self.ghost_speed)
+            self.ghost_direction = np.where(home, HOLD, self.ghost_direction)
+            self.delay = np.where(home, np.array(delay_to_release_after_caught)[gtype], self.delay)
+        target_x = np.where(caught, self.exit_x, target_x)
+        target_y = np.where(caught, self.exit_y, target_y)
+        self.target_x = target_x
+        self.target_y = target_y
+
+        # set direction to go to target
+        x = self.ghost_x
+        y = self.ghost_y
+        tx = target_x - x
+        ty = target_y - y
+        current = self.ghost_direction
+        current = np.where(active & (current == HOLD), np.where(tx > 0, RIGHT, LEFT), current)
+        self.ghost_direction = current
+        across = np.select(
+            [target_x > x, current != RIGHT, target_y < y],
+            [np.where(current != LEFT, RIGHT, np.where(target_y > y, DOWN, UP)), LEFT, UP], DOWN)
+        down_up = np.select(
+            [target_y > y, current != DOWN, target_x > x],
+            [np.where(current != UP, DOWN, np.where(target_x > x, RIGHT, LEFT)), UP, RIGHT], LEFT)
+        go_to = np.where(np.abs(tx) > np.abs(ty), across, down_up)
+        # take the shortest route through the maze if one is known
+        route = self.path_direction(x, y, target_x, target_y, current)
+        go_to = np.where(route != HOLD, route, go_to)
+        return np.where(active, go_to, HOLD)
+
+    def path_direction(self, x, y, target_x, target_y, current):
+        """
+        Array version of PathMap.direction_to for every ghost
+        :return: direction for each ghost or HOLD if no route found
+        """
+        layout = np.broadcast_to(self.layout[:, None], x.shape)
+        col = ((x - X_OFFSET + GRID_WIDTH / 2) // GRID_WIDTH).astype(np.int64) % self.columns
+        row = ((y - Y_OFFSET + GRID_WIDTH / 2) // GRID_WIDTH).astype(np.int64)
+        inside = (row >= 0) & (row < self.rows)
+        cell = np.where(inside, row, 0) * self.columns + col
+        found = inside & self.path_open[layout, cell]
+        # targets in a wall or off the maze use the nearest open cell
+        target_col = np.clip((target_x - X_OFFSET + GRID_WIDTH / 2) // GRID_WIDTH, 0, self.columns - 1)
+        target_row = np.clip((target_y - Y_OFFSET + GRID_WIDTH / 2) // GRID_WIDTH, 0, self.rows - 1)
+        target = self.path_nearest[layout, (target_row * self.columns + target_col).astype(np.int64)]
+        neighbours = self.path_neighbours[layout, cell]
+        exists = neighbours >= 0
+        # only turn back if there is no other way out of the cell
+        ways = exists & (np.array(path_directions) != reverse_of(current)[..., None])
+        ways = np.where(ways.any(axis=-1, keepdims=True), ways, exists)
+        distance = self.path_distances[layout[..., None], target[..., None], np.where(exists, neighbours, 0)]
+        distance = np.where(ways & (distance != UNREACHABLE), distance, self.cells_per_layout)
+        # the first of equal routes is taken
+        best = distance.argmin(axis=-1)
+        found &= distance.min(axis=-1) < self.cells_per_layout
+        return np.where(found, np.array(path_directions)[best], HOLD)
+
+    def get_order(self):
+        # Array version of Ghost.get_order - the 4 directions to try for each ghost
+        tx = self.target_x - self.ghost_x
+        ty = self.target_y - self.ghost_y
+        wider = np.abs(tx) > np.abs(ty)
+        taller = np.abs(tx) < np.abs(ty)
+        choice = np.select([
+            (tx > 0) & (ty > 0) & wider,
+            (tx > 0) & (ty > 0) & taller,
+            (tx < 0) & (ty > 0) & wider,
+            (tx < 0) & (ty > 0) & taller,
+            (tx > 0) & (ty < 0) & wider,
+            (tx > 0) & (ty < 0) & taller,
+            (tx < 0) & (ty < 0) & wider],
+            [0, 4, 1, 5, 2, 6, 3], 7)
+        return np.array(cycle_order)[choice]
+
+    def move_ghosts(self, direction, mask):
+        # try and move the masked ghosts in the directions provided
+        layout = self.layout[:, None]
+        x, y, current, moved = self.try_to_move(direction, self.ghost_x, self.ghost_y, self.ghost_speed,
+                                                self.ghost_direction, mask, layout)
+        self.ghost_x = self.wrap(x, moved)
+        self.ghost_y = y
+        self.ghost_direction = current
+        return moved
+
+    def step(self, actions):
+        """
+        Advance every game still in play by one frame
+        :param actions: array of the direction selected by the player in each game
+        HOLD if no direction selected - the last direction selected is kept
+        """
+        actions = np.asarray(actions)
+        playing = ~self.game_over
+        self.frames[playing] += 1
+
+        # Check for pacman caught
+        done = playing & self.pacman_done
+        lost = done & (self.lives < 1)
+        self.game_over |= lost
+        restart = done & ~lost
+        if restart.any():
+            self.pacman_x[restart] = self.pacman_start_x[restart]
+            self.pacman_y[restart] = self.pacman_start_y[restart]
+            self.pacman_speed[restart] = self.pacman_speed_for_level[restart]
+            self.pacman_direction[restart] = HOLD
+            self.pacman_caught[restart] = False
+            self.pacman_done[restart] = False
+            self.next_direction[restart] = HOLD
+            ghosts = restart[:, None]
+            self.ghost_x = np.where(ghosts, self.ghost_start_x, self.ghost_x)
+            self.ghost_y = np.where(ghosts, self.ghost_start_y, self.ghost_y)
+            self.ghost_mode = np.where(ghosts, np.where(self.ghost_type == CLYDE, RANDOM, CHASE), self.ghost_mode)
+            self.delay = np.where(ghosts, np.array(delay_to_release)[self.ghost_type], self.delay)
+            self.ghost_speed = np.where(ghosts, self.ghost_speed_for_level, self.ghost_speed)
+            self.ghost_direction = np.where(ghosts, HOLD, self.ghost_direction)
+            self.ghost_fright_over(restart)
+        playing &= ~restart
+
+        # get user instruction and move packman
+        move = playing & ~self.level_cleared
+        self.next_direction = np.where(move & (actions != HOLD), actions, self.next_direction)
+        go = move & (self.next_direction != HOLD) & ~self.pacman_caught
+        if go.any():
+            x, y, current, moved = self.try_to_move(self.next_direction, self.pacman_x, self.pacman_y,
+                                                    self.pacman_speed, self.pacman_direction, go, self.layout)
+            retry = go & ~moved
+            x, y, current, moved = self.try_to_move(current, x, y, self.pacman_speed, current, retry, self.layout)
+            self.pacman_x = self.wrap(x, go)
+            self.pacman_y = y
+            self.pacman_direction = current
+        # Caught animation
+        animate = move & self.pacman_caught
+        self.caught_timer[animate] -= 1
+        self.pacman_done |= animate & (self.caught_timer <= -6)
+
+        cont = playing & ~self.pacman_caught
+        # clear eaten and timed out fruit
+        self.fruit_shown &= ~(cont & self.fruit_done)
+        empty = cont & (self.dots_left == 0) & ~self.fruit_shown
+        if empty.any():
+            # End of level
+            start = empty & ~self.level_cleared
+            self.level_cleared |= start
+            self.end_of_level_timer[start] = END_OF_LEVEL_DELAY
+            self.end_of_level_timer[empty] -= 1
+            next_level = empty & (self.end_of_level_timer <= 0)
+            if next_level.any():
+                self.level[next_level] += 1
+                self.set_for_level(next_level)
+                # increase chase length by 2 seconds
+                self.chase_timer[next_level] += FRAME_REFRESH * 2
+                # reduce scatter and frightened length
+                reduce = next_level & (self.scatter_timer > FRIGHT_TIMER * 5)
+                self.scatter_timer[reduce] -= FRAME_REFRESH / 2
+                reduce = next_level & (self.fright_length > FRAME_REFRESH * 5)
+                self.fright_length[reduce] -= FRAME_REFRESH / 2
+            cont &= ~empty | next_level
+
+        # Check if player and a ghost have collided
+        pacman_x = np.abs(self.pacman_x)
+        pacman_y = np.abs(self.pacman_y)
+        for ghost in range(GHOSTS):
+            collide = cont & (np.abs(pacman_x - np.abs(self.ghost_x[:, ghost])) < 20.0) \
+                      & (np.abs(pacman_y - np.abs(self.ghost_y[:, ghost])) < 20.0)
+            if not collide.any():
+                continue
+            mode = self.ghost_mode[:, ghost]
+            eaten = collide & (mode == FRIGHTENED)
+            if eaten.any():
+                self.ghosts_eaten[eaten] += 1
+                points = np.array(ghost_score)[np.clip(self.ghosts_eaten, 1, len(ghost_score)) - 1]
+                self.increase_score(points, eaten)
+                self.ghost_mode[eaten, ghost] = CAUGHT
+                self.ghost_speed[eaten, ghost] = ghost_mex_speed * 2
+            caught = collide & ~eaten & (mode != CAUGHT)
+            self.pacman_caught[caught] = True
+            self.caught_timer[caught] = caught_timer_default
+            self.lives[caught] -= 1
+            self.lives_lost[caught] += 1
+
+        # Check if in fright mode and if timer expired
+        fright = cont & (self.fright_timer > 0)
+        self.fright_timer[fright] -= 1
+        self.ghost_fright_over(fright & (self.fright_timer <= 0))
+        timing = cont & ~fright
+        self.mode_timer[timing] -= 1
+        self.change_ghost_mode(timing & (self.mode_timer <= 0))
+
+        # check if packman has eaten a dot - cells tested in the same order as DotGrid.collisions
+        first_col = (pacman_x - 20.0 - 20) // 20
+        last_col = (pacman_x + 20.0 - 20) // 20 + 1
+        first_row = (pacman_y - 20.0 - 40) // 20
+        last_row = (pacman_y + 20.0 - 40) // 20 + 1
+        games = np.arange(self.games)
+        for i in range(5):
+            row = first_row + i
+            row_ok = cont & (row <= last_row) & (row >= 0) & (row < self.rows)
+            if not row_ok.any():
+                continue
+            row_index = np.where(row_ok, row, 0).astype(np.int64)
+            distance_y = np.abs(pacman_y - (row * 20 + 40))
+            for j in range(5):
+                col = first_col + j
+                ok = row_ok & (col <= last_col) & (col >= 0) & (col < self.columns)
+                col_index = np.where(ok, col, 0).astype(np.int64)
+                distance_x = np.abs(pacman_x - (col * 20 + 20))
+                small = ok & self.dots[games, row_index, col_index] \
+                    & (distance_x < 15.0) & (distance_y < 15.0)
+                big = ok & self.energisers[games, row_index, col_index] \
+                    & (distance_x < 20.0) & (distance_y < 20.0)
+                eaten = small | big
+                if not eaten.any():
+                    continue
+                self.dots[games[small], row_index[small], col_index[small]] = False
+                self.energisers[games[big], row_index[big], col_index[big]] = False
+                self.dots_left[eaten] -= 1
+                self.eat(np.where(big, dot_score[ENERGISER], dot_score[DOT]), eaten, big)
+        # fruit - the display timer is ticked before the fruit is tested as in DotGrid.collisions
+        # so fruit added while eating the dots is ticked too
+        shown = cont & self.fruit_shown
+        self.fruit_timer[shown] -= 1
+        self.fruit_done |= shown & (self.fruit_timer <= 0)
+        # a new fruit added while testing the last one is ticked and tested as well
+        for i in range(2):
+            if i > 0:
+                self.fruit_timer[added] -= 1
+                self.fruit_done |= added & (self.fruit_timer <= 0)
+            eaten = cont & self.fruit_shown & (np.abs(pacman_x - np.abs(self.fruit_x)) < 20.0) \
+                & (np.abs(pacman_y - np.abs(self.fruit_y)) < 20.0)
+            if i > 0:
+                eaten &= added
+            if not eaten.any():
+                break
+            self.fruit_done[eaten] = True
+            number = np.minimum(self.level, 7)
+            added = self.eat(np.array(fruit_score)[number - 1], eaten)
+
+        # set movement direction for each ghost
+        direction = self.set_direction(cont)
+        ghosts = cont[:, None]
+        moved = self.move_ghosts(direction, ghosts)
+        # try to continue to move in current direction
+        retry = ghosts & ~moved
+        if retry.any():
+            moved = self.move_ghosts(self.ghost_direction, retry)
+            retry &= ~moved
+        if retry.any():
+            # Cannot move in the selected direction so test other directions
+            order = self.get_order()
+            trying = retry.copy()
+            for i in range(4):
+                option = order[:, :, i]
+                backwards = option == reverse_of(self.ghost_direction)
+                backwards &= self.ghost_direction != HOLD
+                moved = self.move_ghosts(option, trying & ~backwards)
+                trying &= ~moved
+            # reverse direction if ghost cannot move in any of the tried directions
+            current = self.ghost_direction
+            reverse = np.where(current == HOLD, direction, reverse_of(current))
+            self.move_ghosts(reverse, trying)
@@ -0,0 +1,303 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Benchmarks of the hot paths of the game run without a window on fixed mazes
+and seeded scenarios. Results are saved as JSON so runs can be compared.
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+"""
+
+import os
+# No window or sound needed - set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+from time import perf_counter
+import pygame
+import assets
+from constants import *
+from game_state import GameState, snap_to_grid
+from sprite_list import SpriteList
+from policies import RandomPolicy
+from dot import Dot, DOT, dot_image, fruit_image
+from ghost import Ghost, BLINKY
+from spatial_hash import SpatialHash
+
+# Seed used for every scenario
+benchmark_seed = 1234
+# Frames played before a scenario is measured so the ghosts are out of the pen
+warm_up_frames = 300
+# Ghosts in the swarm collision scenarios
+swarm_size = 200
+
+
+def new_game(level=1, frightened=False):
+    """
+    Create a seeded game part way through a level
+    :param level: level to start - later levels are faster
+    :param frightened: True to put all ghosts in fright mode once warmed up
+    """
+    game = GameState(sound_on=False)
+    game.new_game(benchmark_seed)
+    game.score_board.lives = 1000
+    if level > 1:
+        game.score_board.level = level
+        game.set_for_level()
+    game.start_play()
+    policy = RandomPolicy(benchmark_seed)
+    for _ in range(warm_up_frames):
+        game.update(policy.next_direction(game))
+    if frightened:
+        for ghost in game.ghosts:
+            ghost.set_frightened_mode()
+        game.fright_timer = game.fright_length
+    return game, policy
+
+
+def bench_update(level=1, frightened=False):
+    # One GameState.update with the player directed by a seeded random policy
+    def setup(number):
+        game, policy = new_game(level, frightened)
+        directions = [policy.next_direction(game) for _ in range(number)]
+
+        def run():
+            for direction in directions:
+                game.update(direction)
+        return run
+    return setup
+
+
+def bench_try_to_move(number):
+    # A ghost moving along a corridor - alternate directions so it stays in the corridor
+    game, policy = new_game()
+    ghost = game.ghosts.items[0]
+    start = (ghost.x, ghost.y, ghost.current_direction)
+    directions = [LEFT, RIGHT, UP, DOWN]
+
+    def run():
+        for i in range(number):
+            ghost.x, ghost.y, ghost.current_direction = start
+            game.try_to_move(directions[i % 4], ghost)
+    return run
+
+
+def bench_snap_to_grid(number):
+    positions = [random.Random(benchmark_seed + i).uniform(0, WIDTH) for i in range(number)]
+
+    def run():
+        for pos in positions:
+            snap_to_grid(pos, 3.33)
+    return run
+
+
+def bench_collide_rect(number):
+    game, policy = new_game()
+    pacman = game.pacman
+    ghosts = game.ghosts.items
+
+    def run():
+        for i in range(number):
+            pacman.collide_rect(ghosts[i % 4])
+    return run
+
+
+def new_swarm():
+    # A game with swarm_size ghosts on random walkable cells of the maze
+    game, policy = new_game()
+    rng = random.Random(benchmark_seed)
+    nav = game.nav
+    cells = [(col, row) for row in range(nav.rows) for col in range(nav.columns) if nav.is_walkable(col, row)]
+    ghosts = [Ghost(BLINKY, *rng.choice(cells)) for _ in range(swarm_size)]
+    return game.pacman, ghosts
+
+
+def bench_swarm_scan(number):
+    # One frame of Pac-Man against every ghost and every ghost against every other ghost
+    pacman, ghosts = new_swarm()
+
+    def run():
+        for i in range(number):
+            step = 1 if i % 2 == 0 else -1
+            for ghost in ghosts:
+                ghost.x += step
+            [ghost for ghost in ghosts if pacman.collide_rect(ghost)]
+            [(first, second) for n, first in enumerate(ghosts) for second in ghosts[n + 1:]
+             if first.collide_rect(second)]
+    return run
+
+
+def bench_swarm_hash(number):
+    # The same frame with the sprites in a SpatialHash
+    pacman, ghosts = new_swarm()
+    sprite_hash = SpatialHash(GRID_WIDTH)
+    sprite_hash.add(pacman)
+    for ghost in ghosts:
+        sprite_hash.add(ghost)
+
+    def run():
+        for i in range(number):
+            step = 1 if i % 2 == 0 else -1
+            for ghost in ghosts:
+                ghost.x += step
+            sprite_hash.move_all(ghosts)
+            sprite_hash.collisions(pacman)
+            sprite_hash.pairs()
+    return run
+
+
+def bench_blit(converted):
+    # Sprite images blitted to the display - as loaded from their files or converted by assets.image
+    def setup(number):
+        screen = pygame.display.get_surface()
+        if screen is None:
+            screen = pygame.display.set_mode((WIDTH, HEIGHT))
+        names = dot_image + fruit_image + ['pacOpen.png', 'BlinkyLeft.png', 'frightened.png', 'caught.png']
+        if converted:
+            images = [assets.image(name) for name in names]
+        else:
+            images = [pygame.image.load(assets.asset_path('images', name)) for name in names]
+        positions = [(i % 25 * GRID_WIDTH, i // 25 % 30 * GRID_WIDTH) for i in range(number)]
+
+        def run():
+            for i, position in enumerate(positions):
+                screen.blit(images[i % len(images)], position)
+        return run
+    return setup
+
+
+def bench_clear_done(number):
+    # A level's worth of dots with one in ten eaten
+    lists = []
+    for i in range(number):
+        sprites = SpriteList()
+        for d in range(244):
+            dot = Dot(DOT, d % 28, d // 28)
+            dot.done = d % 10 == i % 10
+            sprites.add(dot)
+        lists.append(sprites)
+
+    def run():
+        for sprites in lists:
+            sprites.clear_done()
+    return run
+
+
+def bench_set_direction(number):
+    game, policy = new_game()
+    ghosts = game.ghosts.items
+
+    def run():
+        for i in range(number):
+            ghosts[i % 4].set_dirction(game.pacman, game.fright_timer)
+    return run
+
+
+def bench_get_order(number):
+    game, policy = new_game()
+    ghosts = game.ghosts.items
+
+    def run():
+        for i in range(number):
+            ghosts[i % 4].get_order()
+    return run
+
+
+def bench_draw(number):
+    # draw_game_screen from main.py - the window is created with the dummy video driver
+    import main
+    main.game.sound_on = False
+    main.game.new_game(benchmark_seed)
+    main.game.start_play()
+    main.score_board.lives = 1000
+    policy = RandomPolicy(benchmark_seed)
+    for _ in range(warm_up_frames):
+        main.game.update(policy.next_direction(main.game))
+
+    def run():
+        for _ in range(number):
+            main.draw_game_screen()
+            main.renderer.update_display()
+    return run
+
+
+# name: (setup function, operations per timing)
+benchmarks = {
+    "try_to_move": (bench_try_to_move, 10000),
+    "snap_to_grid": (bench_snap_to_grid, 10000),
+    "collide_rect": (bench_collide_rect, 10000),
+    "blit_loaded_images": (bench_blit(False), 10000),
+    "blit_converted_images": (bench_blit(True), 10000),
+    "swarm_collisions_scan": (bench_swarm_scan, 20),
+    "swarm_collisions_hash": (bench_swarm_hash, 20),
+    "sprite_list_clear_done": (bench_clear_done, 200),
+    "ghost_set_direction": (bench_set_direction, 10000),
+    "ghost_get_order": (bench_get_order, 10000),
+    "update_full_board": (bench_update(), 2000),
+    "update_level_8": (bench_update(level=8), 2000),
+    "update_frightened": (bench_update(frightened=True), 300),
+    "draw_game_screen": (bench_draw, 300)
+}
+
+
+def run_benchmark(setup, number, repeat):
+    """
+    :return: dict of the best and median time per operation in microseconds
+    """
+    times = []
+    for _ in range(repeat):
+        run = setup(number)
+        start = perf_counter()
+        run()
+        times.append((perf_counter() - start) / number * 1e6)
+    times.sort()
+    return {"best_us": round(times[0], 4), "median_us": round(times[len(times) // 2], 4),
+            "number": number, "repeat": repeat}
+
+
+def git_commit():
+    # current commit of the working tree if available
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the Maze-Man hot paths")
+    parser.add_argument("--output", help="save the results to this JSON file")
+    parser.add_argument("--compare", help="JSON results of an earlier run to compare with")
+    parser.add_argument("--repeat", type=int, default=5, help="timings taken of each benchmark")
+    parser.add_argument("names", nargs="*", help="benchmarks to run (default all)")
+    args = parser.parse_args()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as file:
+            baseline = json.load(file)["benchmarks"]
+
+    results = {}
+    for name, (setup, number) in benchmarks.items():
+        if args.names and name not in args.names:
+            continue
+        result = run_benchmark(setup, number, args.repeat)
+        results[name] = result
+        line = f"{name:24} {result['best_us']:10.3f} us  (median {result['median_us']:.3f})"
+        if baseline and name in baseline:
+            line += f"  {result['best_us'] / baseline[name]['best_us']:6.2f}x of baseline"
+        print(line)
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump({"commit": git_commit(), "python": platform.python_version(),
+                       "pygame": pygame.version.ver, "benchmarks": results}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Bitboard functions - a set of grid cells held as the bits of a Python int,
+bit row * columns + column for each cell in the set. The number of cells is
+the popcount (int.bit_count) and region queries are a single and.
+"""
+
+from functools import lru_cache
+
+
+def bit_index(columns, col, row):
+    # index of the bit for the grid cell
+    return row * columns + col
+
+
+def bit_cells(bits, columns):
+    # Yield the (column, row) of each cell in the bitboard in row order
+    while bits:
+        low = bits & -bits
+        index = low.bit_length() - 1
+        bits ^= low
+        yield index % columns, index // columns
+
+
+@lru_cache(maxsize=64)
+def region_mask(columns, left, top, right, bottom):
+    """
+    :return: bitboard of the cells from column left to right - 1 and row top to bottom - 1
+    """
+    left = max(left, 0)
+    right = min(right, columns)
+    if right <= left:
+        return 0
+    row_mask = ((1 << (right - left)) - 1) << left
+    mask = 0
+    for row in range(max(top, 0), bottom):
+        mask |= row_mask << (row * columns)
+    return mask
+
+
+@lru_cache(maxsize=16)
+def quadrant_masks(columns, rows):
+    """
+    :return: bitboards of the top left, top right, bottom left and bottom right
+    quarters of the grid
+    """
+    mid_col = columns // 2
+    mid_row = rows // 2
+    return (region_mask(columns, 0, 0, mid_col, mid_row),
+            region_mask(columns, mid_col, 0, columns, mid_row),
+            region_mask(columns, 0, mid_row, mid_col, rows),
+            region_mask(columns, mid_col, mid_row, columns, rows))
@@ -4,17 +4,15 @@ PacMan game developed using PyGame
 Brick class used for maze walls
 """
 
-import pygame
 from game_sprite import GameSprite
-
-pygame.init()
+from assets import image
 
 brick_image = [
-	pygame.image.load('images/brick0.png'),
-	pygame.image.load('images/brick1.png'),
-	pygame.image.load('images/brick2.png'),
-	pygame.image.load('images/brick3.png'),
-	pygame.image.load('images/penOpening.png')
+	'brick0.png',
+	'brick1.png',
+	'brick2.png',
+	'brick3.png',
+	'penOpening.png'
 ]
 
 # position of opening image
@@ -23,12 +21,49 @@ OPENING = 4
 
 
 class Brick(GameSprite):
+	__slots__ = ("type",)
+
 	def __init__(self, element, x, y):
-		image = brick_image[element]
+		img = image(brick_image[element])
 		x = x * 20 + 20
 		y = y * 20 + 40
-		super().__init__(image, x, y)
+		super().__init__(img, x, y)
 		if element < 4:
 			self.type = BRICK
 		else:
 			self.type = OPENING
+
+
+# Number of brick styles - each maze layout uses the next style
+brick_styles = 4
+
+# Maze walls pre-rendered onto a background keyed by maze layout index
+background_cache = {}
+
+
+def draw_maze_background(style, maze, size):
+	# Draw the walls and pen opening of the maze on a new surface
+	import pygame
+	background = pygame.Surface(size)
+	background.fill("black")
+	for y, row in enumerate(maze):
+		for x, char in enumerate(row):
+			if char == "X":
+				Brick(style, x, y).draw(background)
+			elif char == "O":
+				Brick(OPENING, x, y).draw(background)
+	return background
+
+
+def get_maze_background(layout, maze, size):
+	# Return the background for the maze layout, drawing the walls and pen opening
+	# the first time the layout is used
+	import pygame
+	background = background_cache.get(layout)
+	if background is None:
+		background = draw_maze_background(layout % brick_styles, maze, size)
+		if pygame.display.get_surface() is not None:
+			# match the display pixel format so the blit is a straight copy
+			background = background.convert()
+		background_cache[layout] = background
+	return background
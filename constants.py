@@ -17,8 +17,22 @@ GAME_OVER = 2
 END_OF_LEVEL_DELAY = 150
 # Width of each screen grid
 GRID_WIDTH = 20
-# Frame rate
+# Frame rate - the game logic is always updated at this rate
 FRAME_REFRESH = 60
+# Screen refresh rate - 0 for as fast as possible
+# sprites are drawn between their logic positions when faster than FRAME_REFRESH
+RENDER_FPS = 60
+# Set True to wait for the display's vertical sync
+VSYNC = False
+# Most game updates run before drawing a frame when the machine falls behind
+MAX_UPDATES_PER_FRAME = 5
+# Set True to only update the areas of the window that change each frame
+# rather than flipping the whole window (faster on software rendered displays)
+DIRTY_RECTS = False
+# Maze pack file or directory to play (see maze_pack.py) - None for the built in mazes
+MAZE_PACK = None
+# Set True to time each part of the game loop from launch (F3 shows the timings, F4 saves them)
+PROFILE = False
 # Timers in screen refreshes
 DISPLAY_FRUIT = FRAME_REFRESH * 7     # 7 seconds
 CHASE_TIMER = FRAME_REFRESH * 20    # 20 seconds - timer
@@ -0,0 +1,75 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+DirtyRectRenderer class - optional renderer that only updates the areas of
+the window that have changed since the last frame
+"""
+
+import pygame
+
+
+class DirtyRectRenderer:
+    def __init__(self, screen, enabled):
+        self.screen = screen
+        self.enabled = enabled
+        # maze background with the remaining dots drawn on it
+        self.layer = None
+        # True when the next frame must redraw and flip the whole window
+        self.full_redraw = True
+        # True when the current frame only needs the dirty areas updating
+        self.partial = False
+        # Areas drawn on in this frame and in the last frame
+        self.drawn = []
+        self.last_drawn = []
+        # Other areas changed this frame e.g. eaten dots
+        self.dirty = []
+
+    def invalidate(self):
+        # Redraw the whole window next frame e.g. after a level transition
+        # or the instruction and game over screens
+        self.full_redraw = True
+        self.partial = False
+
+    def begin_frame(self, background, dots):
+        """
+        Restore the areas drawn on in the last frame
+        :param background: pre-rendered maze walls
+        :param dots: DotGrid - the dots are drawn on the layer and erased as eaten
+        :return: self to be used in place of the screen for drawing the frame
+        """
+        if self.full_redraw:
+            self.layer = background.copy()
+            dots.draw_dots(self.layer)
+            dots.eaten.clear()
+            self.screen.blit(self.layer, (0, 0))
+            self.last_drawn = []
+            self.full_redraw = False
+            self.partial = False
+        else:
+            for rect in self.last_drawn:
+                self.screen.blit(self.layer, rect, rect)
+            for dot in dots.eaten:
+                rect = dot.rect()
+                self.layer.blit(background, rect, rect)
+                self.screen.blit(self.layer, rect, rect)
+                self.dirty.append(rect)
+            dots.eaten.clear()
+            self.partial = True
+        return self
+
+    def blit(self, image, pos, area=None):
+        # Draw on the screen and record the area changed
+        rect = self.screen.blit(image, pos, area)
+        self.drawn.append(rect)
+        return rect
+
+    def update_display(self):
+        # Push the changes to the display
+        if self.partial:
+            pygame.display.update(self.last_drawn + self.drawn + self.dirty)
+        else:
+            pygame.display.flip()
+        self.last_drawn = self.drawn
+        self.drawn = []
+        self.dirty = []
+        self.partial = False
@@ -0,0 +1,170 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+DotGrid class - holds the dots and energisers still to be eaten as one
+bitboard for each type so only the cells the player overlaps need to be
+tested, the number left is a popcount and no object is created for a dot
+until it is eaten
+"""
+
+from constants import GRID_WIDTH
+from assets import image
+from bitboard import bit_index, bit_cells, region_mask, quadrant_masks
+from dot import Dot, DOT, ENERGISER, FRUIT, dot_image
+from sprite_list import SpriteList
+from wall_map import cell_span, X_OFFSET, Y_OFFSET
+
+
+class DotGrid:
+    def __init__(self):
+        self.columns = 0
+        self.rows = 0
+        # Bitboard of the cells with a dot or energiser still to be eaten
+        self.bits = 0
+        # and of the cells with an energiser still to be eaten
+        self.energisers = 0
+        # Fruit currently on display
+        self.fruit = SpriteList()
+        # Dots eaten since last drawn - used by the dirty rectangle renderer
+        self.eaten = []
+
+    def set_dots(self, template):
+        # Place the dots and energisers at the start of a level from its LevelTemplate
+        self.rows = template.rows
+        self.columns = template.columns
+        self.bits = template.dot_bits
+        self.energisers = template.energiser_bits
+
+    def dot_type(self, col, row):
+        # type of the dot in the cell or None if there is not one
+        if 0 <= col < self.columns and 0 <= row < self.rows:
+            index = bit_index(self.columns, col, row)
+            if (self.bits >> index) & 1:
+                return ENERGISER if (self.energisers >> index) & 1 else DOT
+        return None
+
+    def __contains__(self, cell):
+        # True if there is a dot or energiser still to be eaten in the (column, row) cell
+        return self.dot_type(cell[0], cell[1]) is not None
+
+    # Add a dot, energiser or fruit
+    def add(self, item):
+        if item.dtype == FRUIT:
+            self.fruit.add(item)
+        else:
+            bit = 1 << bit_index(self.columns, item.cell[0], item.cell[1])
+            self.bits |= bit
+            if item.dtype == ENERGISER:
+                self.energisers |= bit
+
+    # Remove an item that has been eaten
+    def remove(self, item):
+        if item.dtype == FRUIT:
+            item.done = True
+        else:
+            bit = 1 << bit_index(self.columns, item.cell[0], item.cell[1])
+            self.bits &= ~bit
+            self.energisers &= ~bit
+            self.eaten.append(item)
+
+    # Draw the dots and energisers still to be eaten
+    def draw_dots(self, screen):
+        for dtype, bits in ((DOT, self.bits & ~self.energisers), (ENERGISER, self.energisers)):
+            img = image(dot_image[dtype])
+            x = X_OFFSET - img.get_width() / 2
+            y = Y_OFFSET - img.get_height() / 2
+            for col, row in bit_cells(bits, self.columns):
+                screen.blit(img, (col * GRID_WIDTH + x, row * GRID_WIDTH + y))
+
+    # Draw all items on the screen
+    def draw(self, screen):
+        self.draw_dots(screen)
+        self.fruit.draw(screen)
+
+    # return the number of items still to be eaten including any fruit displayed
+    def number(self):
+        return self.bits.bit_count() + len(self.fruit.items)
+
+    # return the number of dots and energisers still to be eaten
+    def remaining(self):
+        return self.bits.bit_count()
+
+    def count_region(self, left, top, right, bottom):
+        """
+        :return: number of dots and energisers still to be eaten from column
+        left to right - 1 and row top to bottom - 1
+        """
+        return (self.bits & region_mask(self.columns, left, top, right, bottom)).bit_count()
+
+    def quadrant_counts(self):
+        """
+        :return: number of dots and energisers still to be eaten in the
+        top left, top right, bottom left and bottom right of the maze
+        """
+        bits = self.bits
+        return [(bits & mask).bit_count() for mask in quadrant_masks(self.columns, self.rows)]
+
+    def nearest(self, col, row):
+        """
+        :return: (column, row) of the dot or energiser still to be eaten that is
+        the fewest cells across and down from the cell - None if all eaten
+        """
+        best = None
+        best_distance = 0
+        for cell in bit_cells(self.bits, self.columns):
+            distance = abs(cell[0] - col) + abs(cell[1] - row)
+            if best is None or distance < best_distance:
+                best = cell
+                best_distance = distance
+        return best
+
+    # Delete fruit that has been eaten or timed out
+    def clear_done(self):
+        self.fruit.clear_done()
+
+    # Delete all items
+    def clear_all(self):
+        self.bits = 0
+        self.energisers = 0
+        self.fruit.clear_all()
+        self.eaten.clear()
+
+    def collisions(self, game_object):
+        """
+        :param game_object: GameSprite to test
+        :return: generator of the items that collide with the object
+        Dots are returned in row order followed by the fruit. Fruit added
+        while the generator is consumed is also tested.
+        The display timer of each fruit is ticked just before it is tested, as
+        the game always has, so fruit added this frame is ticked this frame.
+        A Dot is only created for a dot or energiser that is hit.
+        """
+        reach = game_object.width / 2 + GRID_WIDTH / 2
+        cols = cell_span(game_object.x, reach, X_OFFSET)
+        x = abs(game_object.x)
+        y = abs(game_object.y)
+        half_width = game_object.width / 2
+        half_height = game_object.height / 2
+        columns = self.columns
+        bits = self.bits
+        energisers = self.energisers
+        hits = []
+        for row in cell_span(game_object.y, reach, Y_OFFSET):
+            if row < 0 or row >= self.rows:
+                continue
+            # the row's cells in the low bits
+            row_bits = bits >> (row * columns)
+            for col in cols:
+                if col < 0 or col >= columns or not (row_bits >> col) & 1:
+                    continue
+                dtype = ENERGISER if (energisers >> bit_index(columns, col, row)) & 1 else DOT
+                # same test as GameSprite.collide_rect
+                img = image(dot_image[dtype])
+                if abs(x - (col * GRID_WIDTH + X_OFFSET)) < half_width + img.get_width() / 2 \
+                        and abs(y - (row * GRID_WIDTH + Y_OFFSET)) < half_height + img.get_height() / 2:
+                    hits.append(Dot(dtype, col, row))
+        yield from hits
+        for item in self.fruit.items:
+            item.update()
+            if game_object.collide_rect(item):
+                yield item
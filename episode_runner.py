@@ -0,0 +1,167 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Runs seeded games without a window across all processor cores and reports
+the spread of results - used to check the level balance of the chase, scatter
+and fright timers without having to play.
+
+    python episode_runner.py --episodes 200 --policy greedy
+"""
+
+import os
+# No window or sound needed - set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from game_state import GameState
+from ghost import ghost_score
+from maze_pack import MazePack
+from policies import RandomPolicy, GreedyPolicy, ReplayPolicy
+from replay import Replay
+
+# Frames before an episode is stopped - 30 minutes of play
+default_max_frames = 60 * 60 * 30
+
+# Percentiles reported for each result
+report_percentiles = [5, 25, 50, 75, 95]
+
+
+def make_policy(name, seed, replay):
+    # Create the player policy for an episode
+    if name == "random":
+        return RandomPolicy(seed)
+    elif name == "greedy":
+        return GreedyPolicy(seed)
+    elif name == "replay":
+        return ReplayPolicy(list(replay.directions()))
+    raise ValueError("Unknown policy: " + name)
+
+
+def run_episode(seed, policy_name, max_frames=default_max_frames, replay=None):
+    """
+    Play one game until game over or max_frames
+    :param seed: seeds both the game and the policy
+    :param policy_name: random, greedy or replay
+    :param replay: Replay played by the replay policy - in a game with the replay's seed
+    :return: dict of results for the episode
+    """
+    maze_pack = None
+    if policy_name == "replay":
+        # the recorded directions only give the same game with the same ghosts and mazes
+        seed = replay.seed
+        if replay.pack is not None:
+            maze_pack = MazePack(replay.pack)
+    policy = make_policy(policy_name, seed, replay)
+    game = GameState(maze_pack=maze_pack, sound_on=False)
+    game.new_game(seed)
+    game.start_play()
+    frames = 0
+    while frames < max_frames and not game.game_over():
+        game.update(policy.next_direction(game))
+        frames += 1
+    return {
+        "seed": seed,
+        "score": game.score_board.score,
+        "level": game.score_board.level,
+        "lives_lost": game.lives_lost,
+        "frames": frames,
+        "game_over": game.game_over(),
+        "ghosts_eaten": dict(zip(ghost_score, game.ghosts_eaten_by_score))
+    }
+
+
+def percentile(values, percent):
+    # Percentile of the values with linear interpolation between ranks
+    values = sorted(values)
+    if not values:
+        return 0
+    position = (len(values) - 1) * percent / 100
+    low = int(position)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (position - low)
+
+
+def summarise(results):
+    """
+    :param results: list of episode results from run_episode
+    :return: dict of result name to dict of percentile to value
+    """
+    columns = {
+        "score": [result["score"] for result in results],
+        "level": [result["level"] for result in results],
+        "lives_lost": [result["lives_lost"] for result in results],
+        "frames": [result["frames"] for result in results]
+    }
+    for points in ghost_score:
+        columns["ghosts_" + str(points)] = [result["ghosts_eaten"][points] for result in results]
+    summary = {}
+    for name, values in columns.items():
+        summary[name] = {"p" + str(p): percentile(values, p) for p in report_percentiles}
+        summary[name]["mean"] = sum(values) / len(values) if values else 0
+    return summary
+
+
+def run_episodes(episodes, policy_name, seed=0, workers=None, max_frames=default_max_frames,
+                 replay=None, on_result=None):
+    """
+    Spread the episodes across a process pool
+    :param on_result: called with each episode result as it completes
+    :return: list of results in seed order
+    """
+    results = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_episode, seed + episode, policy_name, max_frames, replay)
+                   for episode in range(episodes)]
+        for future in as_completed(futures):
+            result = future.result()
+            results.append(result)
+            if on_result is not None:
+                on_result(result)
+    results.sort(key=lambda result: result["seed"])
+    return results
+
+
+def print_summary(summary):
+    print(f"{'':14}" + "".join(f"{'p' + str(p):>10}" for p in report_percentiles) + f"{'mean':>10}")
+    for name, values in summary.items():
+        row = "".join(f"{values['p' + str(p)]:>10.1f}" for p in report_percentiles)
+        print(f"{name:14}{row}{values['mean']:>10.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run Maze-Man games without a window and report the results")
+    parser.add_argument("--episodes", type=int, default=100, help="number of games to play")
+    parser.add_argument("--policy", choices=["random", "greedy", "replay"], default="greedy")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first episode")
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default all cores)")
+    parser.add_argument("--max-frames", type=int, default=default_max_frames)
+    parser.add_argument("--replay", help="replay file played by the replay policy - with its own seed")
+    parser.add_argument("--json", help="write the episode results and summary to this file")
+    parser.add_argument("--quiet", action="store_true", help="only print the summary")
+    args = parser.parse_args()
+
+    replay = None
+    if args.policy == "replay":
+        if args.replay is None:
+            parser.error("--replay is required for the replay policy")
+        replay = Replay.load(args.replay)
+
+    def show(result):
+        if not args.quiet:
+            print(f"seed {result['seed']:>6}  score {result['score']:>7}  level {result['level']:>3}"
+                  f"  lives lost {result['lives_lost']:>3}  frames {result['frames']:>7}")
+
+    results = run_episodes(args.episodes, args.policy, args.seed, args.workers, args.max_frames,
+                           replay, show)
+    summary = summarise(results)
+    print_summary(summary)
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump({"results": results, "summary": summary}, file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+FrameProfiler class - rolling per frame timings of each part of the game loop
+shown as an overlay (F3) and saved as a CSV or JSON trace (F4).
+When disabled each call returns straight away.
+"""
+
+import json
+from collections import deque
+from time import perf_counter
+from constants import *
+from assets import font
+
+# Parts of the game loop timed - idle is the wait for the next frame in clock.tick
+profile_sections = ["input", "pacman", "collision", "dots", "ghosts", "render", "flip", "idle"]
+# Frames kept for the overlay and trace - 10 seconds
+profile_frames = FRAME_REFRESH * 10
+# Frames between updates of the overlay text
+overlay_interval = FRAME_REFRESH // 2
+
+
+def percentile(values, percent):
+    # nearest rank percentile of the values
+    if not values:
+        return 0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * percent / 100))]
+
+
+class FrameProfiler:
+    def __init__(self, enabled=False):
+        self.enabled = enabled
+        # profiling from launch (PROFILE) - otherwise only while the overlay is shown
+        self.always_enabled = enabled
+        self.show_overlay = False
+        self.index = {name: i for i, name in enumerate(profile_sections)}
+        # seconds spent in each section this frame
+        self.current = [0.0] * len(profile_sections)
+        self.section_index = None
+        self.section_start = 0.0
+        self.frame_start = 0.0
+        # (frame period, section times) for each recent frame
+        self.frames = deque(maxlen=profile_frames)
+        self.frame_number = 0
+        # rendered overlay - redrawn every overlay_interval frames
+        self.overlay = None
+        self.font = None
+
+    def toggle_overlay(self):
+        # F3 shows the overlay and starts profiling - hiding it stops profiling unless profiling from launch
+        self.show_overlay = not self.show_overlay
+        if self.show_overlay:
+            self.enabled = True
+        elif not self.always_enabled:
+            self.enabled = False
+            # the next frame timed after profiling restarts has no start time
+            self.section_index = None
+            self.frame_start = 0.0
+        self.overlay = None
+
+    def section(self, name):
+        # Charge the time since the last call to the current section and start timing name
+        if not self.enabled:
+            return
+        now = perf_counter()
+        if self.section_index is not None:
+            self.current[self.section_index] += now - self.section_start
+        self.section_index = self.index[name]
+        self.section_start = now
+
+    def next_frame(self):
+        # Close the current frame and start the next - called once at the top of the loop
+        if not self.enabled:
+            return
+        now = perf_counter()
+        if self.section_index is not None:
+            self.current[self.section_index] += now - self.section_start
+            # the first frame after profiling starts has no start time
+            if self.frame_start > 0:
+                self.frames.append((now - self.frame_start, self.current))
+        self.current = [0.0] * len(profile_sections)
+        self.section_index = None
+        self.frame_start = now
+        self.frame_number += 1
+
+    def summary(self):
+        """
+        :return: dict of fps, p50 and p99 busy frame time in ms and the mean ms of each section
+        """
+        frames = list(self.frames)
+        if not frames:
+            return None
+        idle = self.index["idle"]
+        busy = [(sum(times) - times[idle]) * 1000 for period, times in frames]
+        period = sum(period for period, times in frames) / len(frames)
+        result = {
+            "fps": 1 / period if period > 0 else 0,
+            "p50": percentile(busy, 50),
+            "p99": percentile(busy, 99)
+        }
+        for i, name in enumerate(profile_sections):
+            result[name] = sum(times[i] for period, times in frames) * 1000 / len(frames)
+        return result
+
+    def draw(self, screen):
+        # Draw the overlay in the top left of the maze
+        if not self.show_overlay:
+            return
+        if self.overlay is None or self.frame_number % overlay_interval == 0:
+            self.overlay = self.render_overlay()
+        if self.overlay is not None:
+            screen.blit(self.overlay, (25, 45))
+
+    def render_overlay(self):
+        summary = self.summary()
+        if summary is None:
+            return None
+        # pygame is only needed once the overlay is shown
+        import pygame
+        if self.font is None:
+            self.font = font("freesans", 14, True, False)
+        lines = [f"{summary['fps']:.0f} fps  p50 {summary['p50']:.2f} ms  p99 {summary['p99']:.2f} ms"]
+        lines += [f"{name:10} {summary[name]:6.2f} ms" for name in profile_sections]
+        height = self.font.get_linesize()
+        overlay = pygame.Surface((260, height * len(lines) + 6))
+        overlay.fill("black")
+        for i, line in enumerate(lines):
+            overlay.blit(self.font.render(line, False, "yellow"), (3, 3 + i * height))
+        return overlay
+
+    def dump(self, file_name):
+        """
+        Save the recent frames - JSON if the file name ends .json otherwise CSV
+        Times are in milliseconds
+        """
+        rows = [[round(period * 1000, 4)] + [round(t * 1000, 4) for t in times] for period, times in self.frames]
+        if file_name.endswith(".json"):
+            with open(file_name, "w") as file:
+                json.dump({"columns": ["frame"] + profile_sections, "frames": rows,
+                           "summary": self.summary()}, file, indent=1)
+        else:
+            with open(file_name, "w") as file:
+                file.write(",".join(["frame"] + profile_sections) + "\n")
+                for row in rows:
+                    file.write(",".join(str(value) for value in row) + "\n")
@@ -8,6 +8,10 @@ import math
 
 class GameSprite:
     # Base object for game sprites
+    # attributes are held in fixed slots rather than a per instance dictionary
+    # so sprites are smaller and quicker to access - subclasses add their own
+    __slots__ = ("image", "width", "height", "x", "y", "last_x", "last_y", "dx", "dy", "done")
+
     def __init__(self, image, x, y):
         """
         :param image: pygame image
@@ -17,8 +21,15 @@ class GameSprite:
         self.image = image
         self.width = self.image.get_width()
         self.height = self.image.get_height()
+        self.place(x, y)
+
+    def place(self, x, y):
+        """ put the object at x, y at rest - also used to reuse an object """
         self.x = x
         self.y = y
+        # Position before the last game update - used to draw between updates
+        self.last_x = x
+        self.last_y = y
         # Amount to move on an update
         self.dx = 0
         self.dy = 0
@@ -40,6 +51,29 @@ class GameSprite:
         """ draw on screen - x,y is center of image """
         screen.blit(self.image, (self.x - self.width / 2, self.y - self.height / 2))
 
+    def save_position(self):
+        """ remember the position before a game update """
+        self.last_x = self.x
+        self.last_y = self.y
+
+    def draw_interpolated(self, screen, alpha):
+        """
+        draw part way from the position before the last update to the current position
+        :param alpha: fraction of the way from 0 to 1
+        jumps (the tunnel or returning to start) are not smoothed
+        """
+        x = self.x
+        y = self.y
+        if abs(x - self.last_x) < 40 and abs(y - self.last_y) < 40:
+            x = self.last_x + (x - self.last_x) * alpha
+            y = self.last_y + (y - self.last_y) * alpha
+        screen.blit(self.image, (x - self.width / 2, y - self.height / 2))
+
+    def rect(self):
+        """ :return: (left, top, width, height) of the screen area covered by the image """
+        return (int(self.x - self.width / 2) - 1, int(self.y - self.height / 2) - 1,
+                self.width + 2, self.height + 2)
+
     def collide_rect(self, game_object):
         """
         :param game_object: GameObject to test
@@ -0,0 +1,519 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+GameState class - the game logic separated from the display, keyboard,
+and clock so it can be stepped one frame at a time without a window
+"""
+
+import random
+from constants import *
+from score_board import ScoreBoard
+from maze_grids import maze_layouts
+from maze_pack import MazePack
+from assets import play_sound
+from sprite_list import SpriteList
+from wall_map import WallMap, X_OFFSET, Y_OFFSET
+from dot_grid import DotGrid
+from spatial_hash import SpatialHash
+from frame_profiler import FrameProfiler
+from pac_man import PacMan
+from dot import *
+from ghost import *
+
+
+def snap_to_grid(pos, speed):
+    # Check the position ( x or y) of the object and if near a grid (20x20) edge reposition grid center
+    # this is so that object can change direction if required
+    ipos = round(pos)
+    dist = pos - ipos // 20 * 20
+    # check if near forward grid edge
+    if dist >= 20 - speed / 1.5:
+        # Move to next grid position
+        ipos = ipos + 20 - ipos % 20
+        return ipos
+    elif dist <= speed / 1.5:
+        # Move back to last grid position
+        ipos = ipos - ipos % 20
+        return ipos
+    else:
+        return pos
+
+
+class GameState:
+    def __init__(self, score_board=None, maze_pack=None, sound_on=True):
+        """
+        :param score_board: ScoreBoard holding the score, level, lives and game state
+        a new one is created if not provided
+        :param maze_pack: MazePack of the layouts to play - the built in layouts if not provided
+        :param sound_on: False to play this game without sound e.g. when running without a window
+        """
+        if score_board is None:
+            score_board = ScoreBoard()
+        self.score_board = score_board
+        self.sound_on = sound_on
+        if maze_pack is None:
+            maze_pack = MazePack(maze_layouts)
+        self.maze_pack = maze_pack
+        # index into the maze pack and layout of the current maze
+        self.layout = 0
+        self.maze = None
+        # MazeLevel of the current maze - holds its walls drawn for the screen
+        self.maze_level = None
+        # set if a layout of the maze pack could not be loaded - the game ends
+        self.maze_error = None
+        # grid index of the walls used for collision tests
+        self.walls = WallMap()
+        # compiled walkable cells and exits of the current maze
+        self.nav = None
+        self.dots = DotGrid()
+        self.ghosts = SpriteList()
+        self.pacman = None
+        # pacman and the ghosts by grid cell for the collision tests
+        self.sprite_hash = SpatialHash(GRID_WIDTH)
+        # ghosts by type - reused from level to level
+        self.ghost_pool = {}
+        # position of fruit for current level
+        self.fruit_position = (0, 0)
+        # number of dots eaten for current level
+        self.dots_eaten = 0
+        # Number of scatters so far in level
+        self.scatter_count = 0
+        # Number of ghosts eaten during fright
+        self.ghosts_eaten = 0
+        # Timers for the different modes
+        self.chase_timer = CHASE_TIMER
+        self.scatter_timer = SCATTER_TIMER
+        self.mode_timer = CHASE_TIMER
+        self.fright_length = FRIGHT_TIMER
+        # Set when an energiser eaten
+        self.fright_timer = 0
+        # Current score target to earn a new life
+        self.new_life_target = NEW_LIFE_INTERVAL
+        # Current mode of play
+        self.current_ghost_mode = CHASE
+        # True when all dots eaten
+        self.level_cleared = False
+        # Timer for end of level message to be displayed
+        self.end_of_level_timer = 0
+        # direction selected by player
+        self.next_direction = HOLD
+        # Random number generator for the ghosts - seeded for each game
+        # so a game can be replayed from its seed and the player's directions
+        self.seed = None
+        self.random = random.Random()
+        # Times the parts of each update - replaced by the window's profiler
+        self.profiler = FrameProfiler()
+        # Statistics for the current game
+        self.lives_lost = 0
+        # number of ghosts eaten at each ghost_score value
+        self.ghosts_eaten_by_score = [0] * len(ghost_score)
+
+    def new_game(self, seed=None):
+        # Set defaults for new game
+        # a random seed is chosen if not provided
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.seed = seed
+        self.random.seed(seed)
+        self.maze_error = None
+        self.lives_lost = 0
+        self.ghosts_eaten_by_score = [0] * len(ghost_score)
+        self.score_board.score = 0
+        self.score_board.level = 1
+        self.score_board.lives = START_LIVES
+        self.set_for_level()
+        # reset timers
+        self.chase_timer = CHASE_TIMER
+        self.scatter_timer = SCATTER_TIMER
+        self.fright_length = FRIGHT_TIMER
+        self.new_life_target = NEW_LIFE_INTERVAL
+        if self.maze_error is None:
+            self.score_board.game_state = PAUSED
+
+    def start_play(self):
+        self.score_board.game_state = IN_PLAY
+
+    def game_over(self):
+        return self.score_board.game_state == GAME_OVER
+
+    def create_maze(self):
+        # Set up the maze elements for the new maze
+        # return False and end the game if the layout cannot be loaded
+        self.layout = self.maze_pack.layout_for_level(self.score_board.level)
+        # the walls and exits and the start of the level are compiled when the layout is loaded
+        try:
+            level = self.maze_pack.level(self.layout)
+        except (OSError, ValueError) as error:
+            # a layout that cannot be played (MazeError) or a pack file that cannot be read
+            self.maze_error = error
+            self.score_board.game_state = GAME_OVER
+            return False
+        self.maze_level = level
+        self.maze = level.maze
+        self.nav = level.nav
+        self.walls = self.nav.walls
+        template = level.template
+        self.dots.set_dots(template)
+        self.fruit_position = template.fruit_position
+        # pacman and the ghosts are created for the first level then reset in place
+        if self.pacman is None:
+            self.pacman = PacMan(*template.pacman_cell)
+        else:
+            self.pacman.reset(*template.pacman_cell)
+        for gtype, x, y in template.ghosts:
+            ghost = self.ghost_pool.get(gtype)
+            if ghost is None:
+                ghost = Ghost(gtype, x, y)
+                self.ghost_pool[gtype] = ghost
+            else:
+                ghost.reset(x, y)
+            self.ghosts.add(ghost)
+        # Ghosts leave the pen at Blinky's start position
+        for ghost in self.ghosts:
+            if ghost.gtype == BLINKY:
+                exit_point = ghost.start_position
+        # and find their way with the maze's path map and the game's random numbers
+        paths = level.paths
+        for ghost in self.ghosts:
+            ghost.exit_point = exit_point
+            ghost.paths = paths
+            ghost.random = self.random
+        self.sprite_hash.clear()
+        self.sprite_hash.add(self.pacman)
+        for ghost in self.ghosts:
+            self.sprite_hash.add(ghost)
+        return True
+
+    def set_for_level(self):
+        # resetGame board - called at launch and at the end of each level
+        # Clear existing elements
+        self.dots.clear_all()
+        self.ghosts.clear_all()
+        # Stop player movement
+        self.next_direction = HOLD
+        # Reset number of scatters invoked for new level
+        self.scatter_count = 0
+        #  reset in case grid cleared while in fright mode
+        self.ghosts_eaten = 0
+        # reset dots_eaten counter for new level
+        self.dots_eaten = 0
+        self.level_cleared = False
+        if not self.create_maze():
+            return
+        self.current_ghost_mode = CHASE
+        self.mode_timer = CHASE_TIMER
+        # set pacman and ghost speed for level slow down for first 5 levels
+        if self.score_board.level < 6:
+            speed_percent = 100 - (6 - self.score_board.level) * 5
+            self.pacman.set_speed_percent(speed_percent)
+            for ghost in self.ghosts:
+                ghost.set_speed_percent(speed_percent)
+
+    def turn_blocked(self, direction, game_object):
+        # Return True if turning in direction is certain to hit a wall and leave
+        # the object where it is, so the test move in try_to_move can be skipped.
+        # Only decided when the object is on the center line of its row (or column),
+        # too far from a cell center to snap, and every cell it overlaps is walkable
+        nav = self.nav
+        x = game_object.x
+        y = game_object.y
+        speed = game_object.speed
+        if speed >= GRID_WIDTH / 2 or x < 0 or y < 0:
+            return False
+        if direction == UP or direction == DOWN:
+            if (y - Y_OFFSET) % GRID_WIDTH != 0 or snap_to_grid(x, speed) != x:
+                return False
+            row = int((y - Y_OFFSET) // GRID_WIDTH)
+            next_row = row + (1 if direction == DOWN else -1)
+            if next_row < 0 or next_row >= nav.rows:
+                return False
+            col = int((x - X_OFFSET) // GRID_WIDTH)
+            cells = [(col, row)]
+            if (x - X_OFFSET) % GRID_WIDTH != 0:
+                cells.append((col + 1, row))
+        elif direction == LEFT or direction == RIGHT:
+            if (x - X_OFFSET) % GRID_WIDTH != 0 or snap_to_grid(y, speed) != y:
+                return False
+            col = int((x - X_OFFSET) // GRID_WIDTH)
+            next_col = col + (1 if direction == RIGHT else -1)
+            if next_col < 0 or next_col >= nav.columns:
+                return False
+            row = int((y - Y_OFFSET) // GRID_WIDTH)
+            cells = [(col, row)]
+            if (y - Y_OFFSET) % GRID_WIDTH != 0:
+                cells.append((col, row + 1))
+        else:
+            return False
+        blocked = False
+        for col, row in cells:
+            if not nav.is_walkable(col, row):
+                return False
+            if not nav.can_exit(col, row, direction):
+                blocked = True
+        return blocked
+
+    def try_to_move(self, direction, game_object):
+        # Try to move in the direction given
+        # return Ture if object can move
+        if direction != game_object.current_direction and self.turn_blocked(direction, game_object):
+            return False
+        x_vel = 0
+        y_vel = 0
+        if direction != game_object.current_direction:
+            # snap to grid so if required and possible can change direction
+            game_object.x = snap_to_grid(game_object.x, game_object.speed)
+            game_object.y = snap_to_grid(game_object.y, game_object.speed)
+        if direction == RIGHT:
+            x_vel = game_object.speed
+        elif direction == LEFT:
+            x_vel = -game_object.speed
+        elif direction == UP:
+            y_vel = -game_object.speed
+        elif direction == DOWN:
+            y_vel = game_object.speed
+
+        game_object.x += x_vel
+        game_object.y += y_vel
+
+        # Check if hit a wall and if so stop at wall
+        # only the grid cells the object overlaps are looked up
+        wall = self.walls.find_collision(game_object)
+        if wall is not None:
+            wall_x, wall_y = wall
+            # move back to next grid position
+            if direction == LEFT or direction == RIGHT:
+                if game_object.x % 20 > 10:
+                    # move to right edge
+                    game_object.x = wall_x + 20
+                else:
+                    game_object.x = wall_x - 20
+                    # move to left edge
+            else:
+                if game_object.y % 20 > 10:
+                    # move to bottom edge
+                    game_object.y = wall_y + 20
+                else:
+                    # move to top edge
+                    game_object.y = wall_y - 20
+            return False
+        if game_object.current_direction != direction:
+            game_object.current_direction = direction
+            game_object.change_direction = True
+        return True
+
+    def move_pacman(self, next_direction):
+        # try and move the packman in the direction provided
+        pacman = self.pacman
+        if not self.try_to_move(next_direction, pacman):
+            self.try_to_move(pacman.current_direction, pacman)
+        # Check if exiting screen left or right
+        if pacman.x < 2:
+            pacman.x = WIDTH - 22
+        elif pacman.x > WIDTH - 22:
+            pacman.x = 2
+
+    def move_ghost(self, ghost, direction):
+        # try and move the ghost in the direction provided
+        # return True if ghost can move
+        if not self.try_to_move(direction, ghost):
+            return False
+        ghost.set_direction_image(direction)
+        if ghost.x < 2:
+            ghost.x = WIDTH - 22
+        elif ghost.x > WIDTH - 22:
+            ghost.x = 2
+        return True
+
+    def ghost_fright_over(self):
+        # fright mode over - return to ghosts default state
+        self.ghosts_eaten = 0
+        for ghost in self.ghosts:
+            ghost.set_default_mode(False)
+        self.mode_timer = self.chase_timer
+
+    def change_ghost_mode(self):
+        # called when timer expired to change ghost mode
+        if self.scatter_count < 3 and self.current_ghost_mode == CHASE:
+            # Put ghosts in scatter mode
+            self.scatter_count += 1
+            self.current_ghost_mode = SCATTER
+            self.mode_timer = self.scatter_timer
+            for ghost in self.ghosts:
+                ghost.set_scatter_mode()
+        else:
+            # Put ghosts in chase mode
+            self.current_ghost_mode = CHASE
+            self.mode_timer = self.chase_timer
+            for ghost in self.ghosts:
+                ghost.set_default_mode(False)
+
+    def play_sound(self, name):
+        if self.sound_on:
+            play_sound(name)
+
+    def increase_score(self, points):
+        # increase the score and add a new life if target reached
+        score_board = self.score_board
+        score_board.score += points
+        if score_board.score >= self.new_life_target:
+            self.new_life_target += NEW_LIFE_INTERVAL
+            if score_board.set_new_life():
+                self.play_sound('extraLife.wav')
+
+    def update(self, direction):
+        """
+        Advance the game by one frame
+        :param direction: direction selected by the player this frame
+        HOLD if no direction selected - the last direction selected is kept
+        """
+        score_board = self.score_board
+        pacman = self.pacman
+        dots = self.dots
+        ghosts = self.ghosts
+        profiler = self.profiler
+        profiler.section("pacman")
+        # Check for pacman caught
+        if pacman.done:
+            if score_board.lives < 1:
+                score_board.game_state = GAME_OVER
+                self.play_sound('GameOver.wav')
+            else:
+                pacman.return_to_start()
+                self.next_direction = HOLD
+                for ghost in ghosts:
+                    ghost.jump_to_start()
+                self.ghost_fright_over()
+                return
+
+        if not self.level_cleared:
+            # get user instruction and move packman
+            if direction != HOLD:
+                self.next_direction = direction
+            if self.next_direction != HOLD and not pacman.caught():
+                self.move_pacman(self.next_direction)
+            pacman.update()
+
+        if not pacman.caught():
+            # Game loop
+            profiler.section("dots")
+            dots.clear_done()
+            if dots.number() == 0:
+                # End of level
+                if not self.level_cleared:
+                    # set a timer delay
+                    self.level_cleared = True
+                    self.end_of_level_timer = END_OF_LEVEL_DELAY
+                    self.play_sound('LevelCompleted.wav')
+                    # load the next maze while the end of level message is shown
+                    self.maze_pack.prefetch(self.maze_pack.layout_for_level(score_board.level + 1))
+
+                self.end_of_level_timer -= 1
+                if self.end_of_level_timer <= 0:
+                    # set for next level
+                    score_board.level += 1
+                    self.set_for_level()
+                    if self.maze_error is not None:
+                        return
+                    # increase chase length by 2 seconds
+                    self.chase_timer += FRAME_REFRESH * 2
+                    # reduce scatter and frightened length
+                    if self.scatter_timer > FRIGHT_TIMER * 5:
+                        self.scatter_timer -= FRAME_REFRESH / 2
+                    if self.fright_length > FRAME_REFRESH * 5:
+                        self.fright_length -= FRAME_REFRESH / 2
+                    # continue with the new maze
+                    pacman = self.pacman
+                else:
+                    return
+
+            # Check if player and a ghost have collided
+            profiler.section("collision")
+            # If ghost is in fright mode then we have caught it
+            # increase score, display catch score and set to return to pen
+            # else player has been caught
+            # only the ghosts in the cells around pacman are tested
+            sprite_hash = self.sprite_hash
+            sprite_hash.move(pacman)
+            sprite_hash.move_all(ghosts)
+            for ghost in sprite_hash.collisions(pacman):
+                if ghost.mode == FRIGHTENED:
+                    self.ghosts_eaten += 1
+                    # a ghost can be caught again if another energiser is eaten
+                    # so the score stops at the top value
+                    tier = min(self.ghosts_eaten, len(ghost_score)) - 1
+                    self.ghosts_eaten_by_score[tier] += 1
+                    self.increase_score(ghost_score[tier])
+                    score_board.set_catch_score(ghost_score[tier], (ghost.x, ghost.y))
+                    ghost.return_to_pen()
+                    self.play_sound('eatghost.wav')
+                elif ghost.mode != CAUGHT:
+                    # pacman caught
+                    pacman.set_caught()
+                    self.play_sound('lifeLost.wav')
+                    score_board.lives -= 1
+                    self.lives_lost += 1
+
+            # Check if in fright mode and if timer expired
+            if self.fright_timer > 0:
+                self.fright_timer -= 1
+                if self.fright_timer <= 0:
+                    self.ghost_fright_over()
+            else:
+                self.mode_timer -= 1
+                if self.mode_timer <= 0:
+                    self.change_ghost_mode()
+
+            profiler.section("dots")
+            # check if packman has eaten a dot - only the cells packman overlaps are tested
+            # fruit display timers are ticked as the fruit is tested
+            for dot in dots.collisions(pacman):
+                self.increase_score(dot.score)
+                dots.remove(dot)
+                self.dots_eaten += 1
+                for ghost in ghosts:
+                    # reduce delay to release for penned ghosts
+                    ghost.reduce_delay()
+                # Check if just eaten an energiser
+                if dot.dtype == ENERGISER:
+                    # put ghosts in fright mode
+                    self.play_sound('eatEnergiser.wav')
+                    for ghost in ghosts:
+                        ghost.set_frightened_mode()
+                    self.fright_timer = self.fright_length
+                elif dot.dtype == FRUIT:
+                    score_board.set_catch_score(dot.score, (dot.x, dot.y))
+                # check if fruit to be displayed
+                if self.dots_eaten == 70 or self.dots_eaten == 170:
+                    dots.add(Dot(FRUIT, self.fruit_position[0], self.fruit_position[1], score_board.level))
+            profiler.section("ghosts")
+            for ghost in ghosts:
+                # set movement direction for each ghost
+                direction = ghost.set_dirction(pacman, self.fright_timer)
+                if not self.move_ghost(ghost, direction):
+                    # try to continue to move in current direction
+                    if not self.move_ghost(ghost, ghost.current_direction):
+                        # Cannot move in the selected direction so test other directions
+                        order = ghost.get_order()
+                        for i in range(0, 4):
+                            if order[i] == LEFT and ghost.current_direction == RIGHT:
+                                continue
+                            if order[i] == RIGHT and ghost.current_direction == LEFT:
+                                continue
+                            if order[i] == UP and ghost.current_direction == DOWN:
+                                continue
+                            if order[i] == DOWN and ghost.current_direction == UP:
+                                continue
+                            moved = self.move_ghost(ghost, order[i])
+                            if moved:
+                                break
+                        if not moved:
+                            # reverse direction if ghost cannot move in any of the tried directions
+                            if ghost.current_direction == LEFT:
+                                direction = RIGHT
+                            elif ghost.current_direction == RIGHT:
+                                direction = LEFT
+                            elif ghost.current_direction == UP:
+                                direction = DOWN
+                            elif ghost.current_direction == DOWN:
+                                direction = UP
+                            self.move_ghost(ghost, direction)
@@ -5,13 +5,11 @@ Ghost class and functions
 """
 
 
-import pygame
 from game_sprite import GameSprite
 from constants import *
+from assets import image
 import random
 
-pygame.init()
-
 # Speed reached at level 6 and above
 ghost_mex_speed = 3.33
 
@@ -20,41 +18,35 @@ random_interval = 250
 # Ghosts will look in the direction of movement
 ghost_image = [
     [   # blinky
-        pygame.image.load('images/BlinkyUp.png'),    # For hold
-        pygame.image.load('images/BlinkyLeft.png'),
-        pygame.image.load('images/BlinkyRight.png'),
-        pygame.image.load('images/BlinkyUp.png'),
-        pygame.image.load('images/BlinkyDown.png')
+        'BlinkyUp.png',    # For hold
+        'BlinkyLeft.png',
+        'BlinkyRight.png',
+        'BlinkyUp.png',
+        'BlinkyDown.png'
     ],
     [   # pinky
-        pygame.image.load('images/PinkyUp.png'),
-        pygame.image.load('images/PinkyLeft.png'),
-        pygame.image.load('images/PinkyRight.png'),
-        pygame.image.load('images/PinkyUp.png'),
-        pygame.image.load('images/PinkyDown.png')
+        'PinkyUp.png',
+        'PinkyLeft.png',
+        'PinkyRight.png',
+        'PinkyUp.png',
+        'PinkyDown.png'
     ],
     [   # inky
-        pygame.image.load('images/InkyUp.png'),
-        pygame.image.load('images/InkyLeft.png'),
-        pygame.image.load('images/InkyRight.png'),
-        pygame.image.load('images/InkyUp.png'),
-        pygame.image.load('images/InkyDown.png')
+        'InkyUp.png',
+        'InkyLeft.png',
+        'InkyRight.png',
+        'InkyUp.png',
+        'InkyDown.png'
     ],
     [   # clyde
-        pygame.image.load('images/ClydeUp.png'),
-        pygame.image.load('images/ClydeLeft.png'),
-        pygame.image.load('images/ClydeRight.png'),
-        pygame.image.load('images/ClydeUp.png'),
-        pygame.image.load('images/ClydeDown.png')
+        'ClydeUp.png',
+        'ClydeLeft.png',
+        'ClydeRight.png',
+        'ClydeUp.png',
+        'ClydeDown.png'
     ]
 ]
 
-frightened = pygame.image.load('images/frightened.png')
-frightenedW = pygame.image.load('images/frightened2.png')
-caught = pygame.image.load('images/caught.png')
-
-caught_sound = pygame.mixer.Sound('sounds/eatghost.wav')
-
 
 # Ghosts
 BLINKY = 0
@@ -99,24 +91,32 @@ cycle_order = [
 
 
 class Ghost(GameSprite):
-    # Set when an energiser eaten
-    fright_timer = 0
-    # The positions ghosts move to when released from pen
-    ghost_exit_point = ()
+    __slots__ = ("gtype", "start_position", "exit_point", "paths", "random", "speed", "speed_for_level",
+                 "target", "last_target", "mode", "current_direction", "change_direction", "delay",
+                 "random_timer")
 
     def __init__(self, gtype, x, y):
         self.gtype = gtype
-        # set grid position
+        # use frightened just to initialise
+        super().__init__(image('frightened.png'), 0, 0)
+        # PathMap for the current maze - set when the maze is created
+        self.paths = None
+        # Random number generator for targets - set to the game's generator when the maze is created
+        self.random = random
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        # Set up at grid position x, y for a new level - the ghosts are reused from level to level
         x = x * 20 + 20
         y = y * 20 + 40
-        if gtype == BLINKY:
+        if self.gtype == BLINKY:
             # Center between bricks
             x -= 10
-            # Set the ghost exit point
-            Ghost.ghost_exit_point = (x, y)
-        # use frightened just to initialise
-        super().__init__(frightened, x, y)
+        self.place(x, y)
         self.start_position = (x, y)
+        # The position ghosts move to when released from pen
+        # set to Blinky's start position when the maze is created
+        self.exit_point = (x, y)
         self.speed = ghost_mex_speed
         self.speed_for_level = ghost_mex_speed
         # Just set to a random position as will be set as soon as ghost released
@@ -124,6 +124,8 @@ class Ghost(GameSprite):
         self.last_target = (400, 600)
         self.mode = CHASE
         self.current_direction = HOLD
+        # set by GameState.try_to_move when the direction changes
+        self.change_direction = False
         self.delay = 0
         self.set_default_mode(False)
         self.random_timer = random_interval
@@ -143,7 +145,7 @@ class Ghost(GameSprite):
     def set_default_mode(self, reverse):
         # Set default image and mode of movement
         if self.mode != CAUGHT:
-            self.image = ghost_image[self.gtype][HOLD]
+            self.image = image(ghost_image[self.gtype][HOLD])
             if self.gtype == CLYDE:
                 self.mode = RANDOM
             else:
@@ -167,15 +169,14 @@ class Ghost(GameSprite):
     def set_frightened_mode(self):
         # set frightened mode
         self.mode = FRIGHTENED
-        self.image = frightened
+        self.image = image('frightened.png')
         self.reverse_direction()
         # reduce speed in frightened mode
         self.speed = self.speed * 0.66
 
     def return_to_pen(self):
         # Ghost caught so set to return to pen
-        caught_sound.play()
-        self.image = caught
+        self.image = image('caught.png')
         self.mode = CAUGHT
         self.speed = ghost_mex_speed * 2
 
@@ -201,15 +202,16 @@ class Ghost(GameSprite):
     def set_direction_image(self, direction):
         if self.mode != FRIGHTENED and self.mode != CAUGHT:
             # Set image for direction
-            self.image = ghost_image[self.gtype][direction]
+            self.image = image(ghost_image[self.gtype][direction])
 
-    def set_dirction(self, pacman):
+    def set_dirction(self, pacman, fright_timer):
+        # fright_timer is the frames remaining in fright mode - ghosts flash near the end
         if self.delay <= 0:
             # If currently hold then in the pen so position ghost outside the pen
             # If self.x == self.start_position[0] and self.y == self.start_position[1]:
             if self.current_direction == HOLD:
-                self.x = Ghost.ghost_exit_point[0]
-                self.y = Ghost.ghost_exit_point[1]
+                self.x = self.exit_point[0]
+                self.y = self.exit_point[1]
             # Set target grid cell based on ghost and mode
             if self.mode == CHASE:
                 if self.gtype == BLINKY or self.gtype == CLYDE:
@@ -250,18 +252,18 @@ class Ghost(GameSprite):
                 # Move to a random target at each interval
                 self.random_timer += 1
                 if self.random_timer >= random_interval - 1:
-                    self.last_target = (random.randint(0, WIDTH - 1), random.randint(0, HEIGHT - 1))
+                    self.last_target = (self.random.randint(0, WIDTH - 1), self.random.randint(0, HEIGHT - 1))
                     self.random_timer = 0
                     self.target = self.last_target
-                if self.mode == FRIGHTENED and Ghost.fright_timer < 120:
-                    if Ghost.fright_timer % 15 == 0:
-                        if self.image == frightened:
-                            self.image = frightenedW
+                if self.mode == FRIGHTENED and fright_timer < 120:
+                    if fright_timer % 15 == 0:
+                        if self.image == image('frightened.png'):
+                            self.image = image('frightened2.png')
                         else:
-                            self.image = frightened
+                            self.image = image('frightened.png')
             elif self.mode == CAUGHT:
                 # Ghost has been caught so see if reached exit_point
-                if abs(Ghost.ghost_exit_point[0] - self.x) < 20 and abs(Ghost.ghost_exit_point[1] - self.y) < 20:
+                if abs(self.exit_point[0] - self.x) < 20 and abs(self.exit_point[1] - self.y) < 20:
                     self.x = self.start_position[0]
                     self.y = self.start_position[1]
                     self.mode = CHASE
@@ -269,50 +271,59 @@ class Ghost(GameSprite):
                     self.current_direction = HOLD
                     self.delay = delay_to_release_after_caught[self.gtype]
                 # OK to leave as exit_point as will be changed next refresh
-                self.target = Ghost.ghost_exit_point
+                self.target = self.exit_point
 
-            # set direction to go to target and return
-            tx = self.target[0] - self.x
-            ty = self.target[1] - self.y
             # Test to see if just escaped so default to either left or right
             if self.current_direction == HOLD:
-                if tx > 0:
+                if self.target[0] - self.x > 0:
                     self.current_direction = RIGHT
                 else:
                     self.current_direction = LEFT
-            if abs(tx) > abs(ty):
-                # See if ghost can go in x direction of largest distance
-                # if not try and go y direction
-                if self.target[0] > self.x:
-                    if self.current_direction != LEFT:
-                        go_to = RIGHT
-                    elif self.target[1] > self.y:
-                        go_to = DOWN
-                    else:
-                        go_to = UP
-                elif self.current_direction != RIGHT:
-                    go_to = LEFT
-                elif self.target[1] < self.y:
-                    go_to = UP
-                else:
+            # set direction to go to target and return
+            # take the shortest route through the maze if one is known
+            if self.paths is not None:
+                go_to = self.paths.direction_to(self.x, self.y, self.target, self.current_direction)
+                if go_to is not None:
+                    return go_to
+            return self.direction_to_target()
+        else:
+            return HOLD
+
+    def direction_to_target(self):
+        # Head in the direction of the largest distance to the target
+        tx = self.target[0] - self.x
+        ty = self.target[1] - self.y
+        if abs(tx) > abs(ty):
+            # See if ghost can go in x direction of largest distance
+            # if not try and go y direction
+            if self.target[0] > self.x:
+                if self.current_direction != LEFT:
+                    go_to = RIGHT
+                elif self.target[1] > self.y:
                     go_to = DOWN
-            else:
-                if self.target[1] > self.y:
-                    if self.current_direction != UP:
-                        go_to = DOWN
-                    elif self.target[0] > self.x:
-                        go_to = RIGHT
-                    else:
-                        go_to = LEFT
-                elif self.current_direction != DOWN:
+                else:
                     go_to = UP
+            elif self.current_direction != RIGHT:
+                go_to = LEFT
+            elif self.target[1] < self.y:
+                go_to = UP
+            else:
+                go_to = DOWN
+        else:
+            if self.target[1] > self.y:
+                if self.current_direction != UP:
+                    go_to = DOWN
                 elif self.target[0] > self.x:
                     go_to = RIGHT
                 else:
                     go_to = LEFT
-            return go_to
-        else:
-            return HOLD
+            elif self.current_direction != DOWN:
+                go_to = UP
+            elif self.target[0] > self.x:
+                go_to = RIGHT
+            else:
+                go_to = LEFT
+        return go_to
 
     def get_order(self):
         # set new direction sequence to try
@@ -0,0 +1,53 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+LevelTemplate class - the start of a level read from a maze layout: where
+Pac-Man, the ghosts and fruit start and the dots as bitboards. Built once per
+maze layout and not changed afterwards so the layout strings are only parsed
+the first time the layout is played.
+"""
+
+from bitboard import bit_index
+from ghost import BLINKY, INKY, PINKY, CLYDE
+
+# Ghost type for each ghost character in the maze layouts
+ghost_chars = {"B": BLINKY, "I": INKY, "P": PINKY, "C": CLYDE}
+
+# Level templates keyed by maze layout index
+template_cache = {}
+
+
+def get_level_template(layout, maze):
+    # return the template for the maze layout - built the first time the layout is used
+    template = template_cache.get(layout)
+    if template is None:
+        template = LevelTemplate(maze)
+        template_cache[layout] = template
+    return template
+
+
+class LevelTemplate:
+    def __init__(self, maze):
+        self.rows = len(maze)
+        self.columns = max(len(row) for row in maze)
+        # grid cell of Pac-Man and the fruit
+        self.pacman_cell = (0, 0)
+        self.fruit_position = (0, 0)
+        # (ghost type, column, row) of each ghost in the order found
+        ghosts = []
+        # bitboards of the dots and energisers - see DotGrid
+        self.dot_bits = 0
+        self.energiser_bits = 0
+        for y, row in enumerate(maze):
+            for x, char in enumerate(row):
+                if char == "Y":
+                    self.pacman_cell = (x, y)
+                elif char == "." or char == "E":
+                    self.dot_bits |= 1 << bit_index(self.columns, x, y)
+                    if char == "E":
+                        self.energiser_bits |= 1 << bit_index(self.columns, x, y)
+                elif char == "F":
+                    self.fruit_position = (x, y)
+                elif char in ghost_chars:
+                    ghosts.append((ghost_chars[char], x, y))
+        self.ghosts = tuple(ghosts)
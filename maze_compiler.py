@@ -0,0 +1,314 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Maze compiler - checks each maze layout and compiles it into the tables the
+game uses: walls, exits, dot and energiser bitboards, start positions and the
+pre-rendered background. The compiled layouts are saved in a versioned binary
+cache that is memory mapped when loaded and rebuilt when the layouts, the
+brick images or the compiler change.
+
+    python maze_compiler.py            check the layouts and build the cache
+"""
+
+import hashlib
+import mmap
+import os
+import struct
+from collections import deque
+from constants import *
+from bitboard import bit_index
+from level_template import LevelTemplate
+from nav_graph import NavGraph
+from wall_map import X_OFFSET, Y_OFFSET
+from assets import asset_path, game_folder
+
+# Changed whenever the cache format or the compiled tables change
+compiler_version = 1
+cache_magic = b"MAZEMAN\0"
+default_cache_file = os.path.join(game_folder, "maze_cache", "mazes.bin")
+
+# Grid size that fits between the score at the top and the lives at the bottom of the window
+maze_columns = (WIDTH - X_OFFSET) // GRID_WIDTH
+maze_rows = (HEIGHT - Y_OFFSET - 30) // GRID_WIDTH
+# Characters that may be used in a layout - see maze_grids.py
+maze_chars = "XO.EBIPCYF "
+# Characters that must appear once in every layout
+single_chars = "YFBIPC"
+# Energisers in every layout
+maze_energisers = 4
+# The second fruit appears when this many dots have been eaten
+min_dots = 170
+
+# magic, compiler version, sha256 of the source, number of layouts
+header = struct.Struct("<8sI32sI")
+# For each layout: rows, columns, background width and height,
+# pacman (column, row), fruit (column, row), (type, column, row) of 4 ghosts and
+# (offset, length) of the text, walls, exits, dots, energisers and background sections
+record = struct.Struct("<HHHHhhhh12h12I")
+
+
+class MazeError(ValueError):
+    # A maze layout that cannot be played
+    pass
+
+
+def validate_maze(maze, name="layout"):
+    """
+    Check the layout can be played
+    :param maze: list of row strings as in maze_grids.py
+    :param name: used in the error message
+    :return: NavGraph of the maze
+    raises MazeError describing the first problem found
+    """
+    if len(maze) != maze_rows:
+        raise MazeError(f"{name}: has {len(maze)} rows - {maze_rows} expected")
+    counts = {char: 0 for char in maze_chars}
+    for y, row in enumerate(maze):
+        if len(row) != maze_columns:
+            raise MazeError(f"{name}: row {y} has {len(row)} columns - {maze_columns} expected")
+        for x, char in enumerate(row):
+            if char not in counts:
+                raise MazeError(f"{name}: unknown character {char!r} at column {x} row {y}")
+            counts[char] += 1
+        # the tunnel must come out on the other side
+        if (row[0] == "X") != (row[-1] == "X"):
+            raise MazeError(f"{name}: row {y} is open at one side only")
+    for char in single_chars:
+        if counts[char] != 1:
+            raise MazeError(f"{name}: has {counts[char]} {char!r} - 1 expected")
+    if counts["O"] == 0:
+        raise MazeError(f"{name}: has no pen opening 'O'")
+    if counts["E"] != maze_energisers:
+        raise MazeError(f"{name}: has {counts['E']} energisers - {maze_energisers} expected")
+    if counts["."] < min_dots:
+        raise MazeError(f"{name}: has {counts['.']} dots - at least {min_dots} needed")
+    # every dot and the fruit and Blinky's start must be reachable by pacman
+    nav = NavGraph(maze)
+    start = None
+    for y, row in enumerate(maze):
+        if "Y" in row:
+            start = bit_index(nav.columns, row.index("Y"), y)
+    reached = bytearray(nav.columns * nav.rows)
+    reached[start] = 1
+    queue = deque([start])
+    while queue:
+        index = queue.popleft()
+        for direction, next_index in nav.neighbours[index]:
+            if not reached[next_index]:
+                reached[next_index] = 1
+                queue.append(next_index)
+    for y, row in enumerate(maze):
+        for x, char in enumerate(row):
+            if char in ".EFB" and not reached[bit_index(nav.columns, x, y)]:
+                raise MazeError(f"{name}: {char!r} at column {x} row {y} cannot be reached")
+    return nav
+
+
+class CompiledMaze:
+    # The tables of one layout - has the attributes of a LevelTemplate so can be used in its place
+    def __init__(self):
+        self.maze = None
+        self.rows = 0
+        self.columns = 0
+        # one byte per cell - 1 for a wall or the pen opening
+        self.walls = b""
+        # one byte per cell of exit bits - see nav_graph.exit_bit
+        self.exits = b""
+        self.dot_bits = 0
+        self.energiser_bits = 0
+        self.pacman_cell = (0, 0)
+        self.fruit_position = (0, 0)
+        self.ghosts = ()
+        # RGB pixels of the background or None if not compiled
+        self.background = None
+        self.background_size = (0, 0)
+
+    def background_surface(self):
+        # pygame surface of the background - shares the compiled pixels until converted
+        import pygame
+        if self.background is None:
+            return None
+        surface = pygame.image.frombuffer(self.background, self.background_size, "RGB")
+        if pygame.display.get_surface() is not None:
+            return surface.convert()
+        return surface
+
+
+def compile_maze(maze, layout=0, background=True):
+    """
+    :param layout: index of the layout - sets the brick style of the walls
+    :param background: False to leave out the background, which needs pygame
+    :return: CompiledMaze of a valid layout
+    """
+    nav = validate_maze(maze, f"layout {layout}")
+    compiled = CompiledMaze()
+    compiled.maze = list(maze)
+    compiled.rows = nav.rows
+    compiled.columns = nav.columns
+    compiled.walls = bytes(nav.walls.cells)
+    compiled.exits = bytes(nav.exits)
+    template = LevelTemplate(maze)
+    compiled.pacman_cell = template.pacman_cell
+    compiled.fruit_position = template.fruit_position
+    compiled.ghosts = template.ghosts
+    compiled.dot_bits = template.dot_bits
+    compiled.energiser_bits = template.energiser_bits
+    if background:
+        import pygame
+        from brick import draw_maze_background, brick_styles
+        surface = draw_maze_background(layout % brick_styles, maze, (WIDTH, HEIGHT))
+        compiled.background = pygame.image.tobytes(surface, "RGB")
+        compiled.background_size = (WIDTH, HEIGHT)
+    return compiled
+
+
+def content_hash(layouts, background=True):
+    # sha256 of everything the compiled tables depend on
+    digest = hashlib.sha256()
+    digest.update(f"{compiler_version} {background}\n".encode())
+    for maze in layouts:
+        digest.update("\n".join(maze).encode() + b"\0")
+    if background:
+        from brick import brick_image
+        for name in brick_image:
+            with open(asset_path('images', name), "rb") as file:
+                digest.update(file.read())
+    return digest.digest()
+
+
+def bitboard_bytes(bits, cells):
+    return bits.to_bytes((cells + 7) // 8, "little")
+
+
+def save_compiled(file_name, compiled_layouts, digest):
+    # Write the compiled layouts - to a temporary file first so a reader never sees half a cache
+    directory = os.path.dirname(file_name)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    records = []
+    data = bytearray()
+    offset = header.size + record.size * len(compiled_layouts)
+    for compiled in compiled_layouts:
+        cells = compiled.rows * compiled.columns
+        sections = [
+            "\n".join(compiled.maze).encode(),
+            compiled.walls,
+            compiled.exits,
+            bitboard_bytes(compiled.dot_bits, cells),
+            bitboard_bytes(compiled.energiser_bits, cells),
+            compiled.background or b""
+        ]
+        places = []
+        for section in sections:
+            places += [offset + len(data), len(section)]
+            data += section
+        ghosts = [value for ghost in compiled.ghosts for value in ghost]
+        records.append(record.pack(compiled.rows, compiled.columns, *compiled.background_size,
+                                   *compiled.pacman_cell, *compiled.fruit_position, *ghosts, *places))
+    temp_name = file_name + ".tmp"
+    with open(temp_name, "wb") as file:
+        file.write(header.pack(cache_magic, compiler_version, digest, len(compiled_layouts)))
+        for packed in records:
+            file.write(packed)
+        file.write(data)
+    os.replace(temp_name, file_name)
+
+
+def load_compiled(file_name, digest):
+    """
+    Map the cache file into memory
+    :return: list of CompiledMaze or None if there is no cache or it is out of date,
+    cut short or corrupt - so the layouts are compiled again
+    """
+    try:
+        with open(file_name, "rb") as file:
+            buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        return read_compiled(buffer, digest)
+    except (struct.error, ValueError, UnicodeDecodeError):
+        return None
+
+
+def read_compiled(buffer, digest):
+    # The compiled layouts in the cache - raises ValueError if a record or section is outside the file
+    magic, version, saved_digest, count = header.unpack_from(buffer, 0)
+    if magic != cache_magic or version != compiler_version or saved_digest != digest:
+        return None
+    if header.size + record.size * count > len(buffer):
+        raise ValueError("cache records cut short")
+    view = memoryview(buffer)
+    compiled_layouts = []
+    for i in range(count):
+        values = record.unpack_from(buffer, header.size + record.size * i)
+        sections = []
+        for s in range(6):
+            offset = values[20 + s * 2]
+            length = values[21 + s * 2]
+            if offset + length > len(buffer):
+                raise ValueError("cache section outside the file")
+            sections.append(view[offset:offset + length])
+        text, walls, exits, dots, energisers, background = sections
+        compiled = CompiledMaze()
+        compiled.rows, compiled.columns = values[0:2]
+        compiled.background_size = values[2:4]
+        cells = compiled.rows * compiled.columns
+        if len(walls) != cells or len(exits) != cells or \
+                len(background) not in (0, compiled.background_size[0] * compiled.background_size[1] * 3):
+            raise ValueError("cache section the wrong size")
+        compiled.pacman_cell = values[4:6]
+        compiled.fruit_position = values[6:8]
+        compiled.ghosts = tuple(values[8 + g * 3:11 + g * 3] for g in range(4))
+        compiled.maze = bytes(text).decode().split("\n")
+        compiled.walls = walls
+        compiled.exits = exits
+        compiled.dot_bits = int.from_bytes(dots, "little")
+        compiled.energiser_bits = int.from_bytes(energisers, "little")
+        compiled.background = background if len(background) else None
+        compiled_layouts.append(compiled)
+    return compiled_layouts
+
+
+def load_layouts(layouts, cache_file=default_cache_file, background=True):
+    """
+    Compiled tables of the layouts - from the cache when it is up to date
+    otherwise every layout is checked and compiled and the cache saved
+    :return: list of CompiledMaze in layout order
+    raises MazeError if a layout cannot be played
+    """
+    digest = content_hash(layouts, background)
+    compiled_layouts = load_compiled(cache_file, digest)
+    if compiled_layouts is None:
+        compiled_layouts = [compile_maze(maze, i, background) for i, maze in enumerate(layouts)]
+        try:
+            save_compiled(cache_file, compiled_layouts, digest)
+        except OSError:
+            # the cache cannot be written (e.g. a read only install) - play from the
+            # layouts compiled in memory and compile them again next time
+            pass
+    return compiled_layouts
+
+
+def use_compiled(compiled_layouts):
+    # Use the compiled tables in place of parsing the layouts as each level starts
+    from level_template import template_cache
+    from nav_graph import nav_cache
+    for layout, compiled in enumerate(compiled_layouts):
+        template_cache[layout] = compiled
+        nav_cache[layout] = NavGraph(compiled=compiled)
+        if compiled.background is not None:
+            from brick import background_cache
+            background_cache[layout] = compiled.background_surface()
+
+
+if __name__ == "__main__":
+    import time
+    from maze_grids import maze_layouts
+    start = time.perf_counter()
+    compiled_layouts = load_layouts(maze_layouts)
+    for i, compiled in enumerate(compiled_layouts):
+        print(f"layout {i}: {compiled.dot_bits.bit_count()} dots and energisers, "
+              f"{compiled.energiser_bits.bit_count()} energisers")
+    print(f"{len(compiled_layouts)} layouts ready in {(time.perf_counter() - start) * 1000:.1f} ms"
+          f" - {default_cache_file}")
@@ -0,0 +1,285 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Reinforcement learning environments with the Gymnasium reset/step interface.
+MazeManEnv plays one GameState without a window and VectorMazeManEnv plays
+many games at once with BatchSimulation. Observations are a stack of one
+byte per grid cell planes (see observation_channels) kept up to date as the
+game changes rather than redrawn from the sprites each step.
+If Gymnasium is installed MazeManEnv is a gymnasium.Env with its spaces set.
+Requires NumPy.
+
+    env = MazeManEnv()
+    observation, info = env.reset(seed=1)
+    observation, reward, terminated, truncated, info = env.step(LEFT)
+"""
+
+import random
+import numpy as np
+from constants import *
+from game_state import GameState
+from batch_simulation import BatchSimulation, GHOSTS
+from maze_grids import maze_layouts
+from ghost import CHASE, SCATTER, FRIGHTENED, RANDOM, CAUGHT, TO_PEN
+from wall_map import X_OFFSET, Y_OFFSET
+
+try:
+    import gymnasium
+    from gymnasium import spaces
+except ImportError:
+    gymnasium = None
+    spaces = None
+
+# Planes of the observation - 1 where the cell holds the item
+observation_channels = ["walls", "dots", "energisers", "fruit", "pacman",
+                        "ghosts_hunting", "ghosts_frightened", "ghosts_returning"]
+WALLS, DOTS, ENERGISERS, FRUIT_CHANNEL, PACMAN, HUNTING, FRIGHTENED_CHANNEL, RETURNING = \
+    range(len(observation_channels))
+# Observation plane of a ghost in each mode
+ghost_mode_channel = {
+    CHASE: HUNTING,
+    SCATTER: HUNTING,
+    RANDOM: HUNTING,
+    FRIGHTENED: FRIGHTENED_CHANNEL,
+    CAUGHT: RETURNING,
+    TO_PEN: RETURNING
+}
+# Actions are the directions a player can select
+actions = [HOLD, LEFT, RIGHT, UP, DOWN]
+
+# Grid size of the observation
+grid_rows = len(maze_layouts[0])
+grid_columns = max(len(row) for row in maze_layouts[0])
+observation_shape = (len(observation_channels), grid_rows, grid_columns)
+plane_size = grid_rows * grid_columns
+
+# Steps before an episode is truncated - 30 minutes of play
+default_max_steps = 60 * 60 * 30
+
+
+def grid_cell(x, y):
+    # flat index of the grid cell nearest to a screen position - the tunnel exits are kept in the grid
+    col = round((x - X_OFFSET) / GRID_WIDTH)
+    row = round((y - Y_OFFSET) / GRID_WIDTH)
+    if col < 0:
+        col = 0
+    elif col >= grid_columns:
+        col = grid_columns - 1
+    if row < 0:
+        row = 0
+    elif row >= grid_rows:
+        row = grid_rows - 1
+    return row * grid_columns + col
+
+
+def bitboard_plane(bits):
+    # one byte per grid cell of a bitboard from bitboard.py
+    data = np.frombuffer(bits.to_bytes((plane_size + 7) // 8, "little"), dtype=np.uint8)
+    return np.unpackbits(data, bitorder="little")[:plane_size].reshape(grid_rows, grid_columns)
+
+
+class MazeManEnv(gymnasium.Env if gymnasium is not None else object):
+    metadata = {"render_modes": []}
+
+    def __init__(self, max_steps=default_max_steps, frame_skip=1, life_penalty=0):
+        """
+        :param max_steps: steps before an episode is truncated
+        :param frame_skip: game frames played with the same action each step
+        :param life_penalty: taken from the reward each time a life is lost
+        """
+        self.game = GameState(sound_on=False)
+        self.max_steps = max_steps
+        self.frame_skip = frame_skip
+        self.life_penalty = life_penalty
+        self.steps = 0
+        self.observation = np.zeros(observation_shape, dtype=np.uint8)
+        # flat view of the observation - setting a byte is quicker than indexing the array
+        self.cells = memoryview(self.observation.reshape(-1))
+        # index in cells of Pac-Man, the ghosts and fruit set in the last observation
+        self.entity_cells = []
+        # level shown in the observation - the maze planes are rebuilt when it changes
+        self.level = None
+        if spaces is not None:
+            self.action_space = spaces.Discrete(len(actions))
+            self.observation_space = spaces.Box(0, 1, observation_shape, dtype=np.uint8)
+
+    def reset(self, seed=None, options=None):
+        """
+        Start a new game
+        :param seed: seed for the game - a random seed is chosen if None
+        :return: (observation, info)
+        """
+        if gymnasium is not None:
+            # seeds np_random as the Env API expects
+            super().reset(seed=seed)
+        self.game.new_game(seed)
+        self.game.start_play()
+        self.steps = 0
+        self.level = None
+        self.update_observation()
+        return self.observation.copy(), self.info()
+
+    def step(self, action):
+        """
+        Play frame_skip frames with the direction selected - as main.update_game but without a window
+        :param action: HOLD, LEFT, RIGHT, UP or DOWN
+        :return: (observation, reward, terminated, truncated, info)
+        the reward is the points scored less life_penalty for each life lost
+        """
+        game = self.game
+        score = game.score_board.score
+        lives_lost = game.lives_lost
+        for _ in range(self.frame_skip):
+            game.update(action)
+            game.score_board.update()
+            if game.game_over():
+                break
+        self.steps += 1
+        self.update_observation()
+        reward = game.score_board.score - score - self.life_penalty * (game.lives_lost - lives_lost)
+        terminated = game.game_over()
+        truncated = not terminated and self.steps >= self.max_steps
+        return self.observation.copy(), reward, terminated, truncated, self.info()
+
+    def info(self):
+        score_board = self.game.score_board
+        return {"score": score_board.score, "level": score_board.level, "lives": score_board.lives,
+                "lives_lost": self.game.lives_lost}
+
+    def load_maze(self):
+        # Set the maze planes for a new level
+        game = self.game
+        self.observation.fill(0)
+        self.entity_cells = []
+        self.observation[WALLS] = np.frombuffer(game.walls.cells, dtype=np.uint8).reshape(grid_rows, grid_columns)
+        self.observation[DOTS] = bitboard_plane(game.dots.bits & ~game.dots.energisers)
+        self.observation[ENERGISERS] = bitboard_plane(game.dots.energisers)
+        game.dots.eaten.clear()
+        self.level = game.score_board.level
+
+    def update_observation(self):
+        # Clear the dots eaten and move Pac-Man, the ghosts and fruit to their new cells
+        game = self.game
+        if game.score_board.level != self.level:
+            self.load_maze()
+        cells = self.cells
+        dots = game.dots
+        for dot in dots.eaten:
+            cell = dot.cell[1] * grid_columns + dot.cell[0]
+            cells[DOTS * plane_size + cell] = 0
+            cells[ENERGISERS * plane_size + cell] = 0
+        dots.eaten.clear()
+        for index in self.entity_cells:
+            cells[index] = 0
+        entity_cells = [PACMAN * plane_size + grid_cell(game.pacman.x, game.pacman.y)]
+        for ghost in game.ghosts:
+            entity_cells.append(ghost_mode_channel[ghost.mode] * plane_size + grid_cell(ghost.x, ghost.y))
+        for fruit in dots.fruit:
+            if not fruit.done:
+                entity_cells.append(FRUIT_CHANNEL * plane_size + grid_cell(fruit.x, fruit.y))
+        for index in entity_cells:
+            cells[index] = 1
+        self.entity_cells = entity_cells
+
+
+class VectorMazeManEnv:
+    def __init__(self, num_envs, max_steps=default_max_steps, frame_skip=1, life_penalty=0):
+        """
+        Many games played in lockstep with BatchSimulation
+        Games that finish are started again with the next seed, the observation
+        returned is then the first of the new game and info holds the result
+        of the finished game
+        :param num_envs: number of games
+        """
+        self.num_envs = num_envs
+        self.max_steps = max_steps
+        self.frame_skip = frame_skip
+        self.life_penalty = life_penalty
+        self.sim = BatchSimulation(num_envs)
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+        self.next_seed = 0
+        self.observations = np.zeros((num_envs,) + observation_shape, dtype=np.uint8)
+        self.planes = self.observations.reshape(num_envs, len(observation_channels), -1)
+        # channel and cell of Pac-Man, the ghosts and fruit in the last observation
+        self.entity_channels = np.full((num_envs, GHOSTS + 2), PACMAN, dtype=np.int64)
+        self.entity_cells = np.zeros((num_envs, GHOSTS + 2), dtype=np.int64)
+        # level shown in each observation - the walls are set again when it changes
+        self.level = np.zeros(num_envs, dtype=np.int64)
+        self.games = np.arange(num_envs)
+        self.mode_channel = np.array([ghost_mode_channel[mode] for mode in range(len(ghost_mode_channel))])
+        if spaces is not None:
+            self.single_action_space = spaces.Discrete(len(actions))
+            self.single_observation_space = spaces.Box(0, 1, observation_shape, dtype=np.uint8)
+
+    def reset(self, seed=None, options=None):
+        """
+        Start a new game in every environment
+        :param seed: games are seeded seed, seed + 1, ... - random if None
+        :return: (observations, info)
+        """
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+        self.next_seed = seed
+        self.start_games(np.ones(self.num_envs, dtype=bool))
+        self.update_observations()
+        return self.observations.copy(), self.info()
+
+    def start_games(self, mask):
+        # new games with the next seeds in the selected environments
+        for game in np.flatnonzero(mask):
+            self.sim.random[game].seed(self.next_seed)
+            self.next_seed += 1
+        self.sim.new_game(mask)
+        self.steps[mask] = 0
+        self.level[mask] = 0
+
+    def step(self, actions):
+        """
+        :param actions: direction selected in each game
+        :return: (observations, rewards, terminated, truncated, info) arrays
+        """
+        sim = self.sim
+        actions = np.asarray(actions)
+        score = sim.score.copy()
+        lives_lost = sim.lives_lost.copy()
+        for _ in range(self.frame_skip):
+            sim.step(actions)
+        self.steps += 1
+        rewards = sim.score - score - self.life_penalty * (sim.lives_lost - lives_lost)
+        terminated = sim.game_over.copy()
+        truncated = ~terminated & (self.steps >= self.max_steps)
+        info = self.info()
+        finished = terminated | truncated
+        if finished.any():
+            self.start_games(finished)
+        self.update_observations()
+        return self.observations.copy(), rewards, terminated, truncated, info
+
+    def info(self):
+        sim = self.sim
+        return {"score": sim.score.copy(), "level": sim.level.copy(), "lives": sim.lives.copy(),
+                "lives_lost": sim.lives_lost.copy()}
+
+    def update_observations(self):
+        # Copy the dot planes and move Pac-Man, the ghosts and fruit to their new cells
+        sim = self.sim
+        observations = self.observations
+        changed = sim.level != self.level
+        if changed.any():
+            observations[changed, WALLS] = sim.layout_walls[sim.layout[changed]]
+            self.level[changed] = sim.level[changed]
+        observations[:, DOTS] = sim.dots
+        observations[:, ENERGISERS] = sim.energisers
+        games = self.games[:, None]
+        self.planes[games, self.entity_channels, self.entity_cells] = 0
+        x = np.concatenate([sim.pacman_x[:, None], sim.ghost_x, sim.fruit_x[:, None]], axis=1)
+        y = np.concatenate([sim.pacman_y[:, None], sim.ghost_y, sim.fruit_y[:, None]], axis=1)
+        cols = np.clip(np.rint((x - X_OFFSET) / GRID_WIDTH), 0, grid_columns - 1).astype(np.int64)
+        rows = np.clip(np.rint((y - Y_OFFSET) / GRID_WIDTH), 0, grid_rows - 1).astype(np.int64)
+        self.entity_cells = rows * grid_columns + cols
+        self.entity_channels[:, 0] = PACMAN
+        self.entity_channels[:, 1:GHOSTS + 1] = self.mode_channel[sim.ghost_mode]
+        self.entity_channels[:, GHOSTS + 1] = FRUIT_CHANNEL
+        values = np.ones((self.num_envs, GHOSTS + 2), dtype=np.uint8)
+        values[:, GHOSTS + 1] = sim.fruit_shown & ~sim.fruit_done
+        self.planes[games, self.entity_channels, self.entity_cells] = values
@@ -7,7 +7,7 @@ Grid layouts
 #  Definition of mazes and initial positions
 #  X = a wall/border (no limit)
 #  O = pen opening from which ghosts escape
-#  . = a small dot (244 per level)
+#  . = a small dot (at least 170 per level - 239 to 254 in these layouts)
 #  E = an energiser (4 per level)
 #  B = ghost blinky (1 per level - start outside pen and is pen escape point - will be offset 10 to left to centralise)
 #  I = ghost inky (1 per level - start in pen)
@@ -15,6 +15,7 @@ Grid layouts
 #  C = ghost clyde (1 per level - start in pen)
 #  Y = You the player (1 per level - will be offset 10 to the left to centralise)
 #  F = Position bonus fruit will appear (will be offset 10 to the left to centralise)
+#  Layouts are 31 rows of 28 characters - checked by maze_compiler.py when the game starts
 
 maze_layouts = [
 [
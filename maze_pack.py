@@ -0,0 +1,249 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+MazePack class - the maze layouts played level after level. The built in
+layouts from maze_grids.py or an external pack of any number of layouts in
+a text file or a directory. Only the layout being played and the next are
+kept loaded - the next is compiled on a background thread while the end of
+level message is shown so a new level starts without a pause. Only the layout
+is read and compiled on that thread - the walls are drawn with pygame on the
+display thread when the level is first shown.
+
+Pack file - each layout is 31 rows of 28 characters as in maze_grids.py,
+layouts are separated by one or more empty lines and lines starting with #
+are comments.
+Pack directory - each .txt file is a pack file holding one layout, played
+in file name order.
+
+Check every layout of a pack before playing it:
+
+    python maze_pack.py my_pack.txt
+"""
+
+import os
+import threading
+from constants import *
+from nav_graph import get_nav_graph
+from level_template import LevelTemplate, get_level_template
+from path_map import PathMap, get_path_map
+from maze_compiler import MazeError, validate_maze
+
+
+class MazeLevel:
+    # A maze layout ready to play
+    def __init__(self, layout, maze, nav, template, paths):
+        self.layout = layout
+        self.maze = maze
+        # walkable cells and exits, start of the level and the ghosts' path map
+        self.nav = nav
+        self.template = template
+        self.paths = paths
+        # the walls drawn on a pygame surface - None until the level is first shown
+        self.background = None
+
+
+def read_layout(lines):
+    # Layout rows from the lines of a pack file - without line endings and comments
+    maze = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if not line.startswith("#"):
+            maze.append(line)
+    return maze
+
+
+def index_pack_file(file_name):
+    """
+    Find where each layout starts in the pack file without reading the layouts
+    :return: list of (offset, number of lines) of each layout
+    """
+    layouts = []
+    start = None
+    count = 0
+    offset = 0
+    with open(file_name, "rb") as file:
+        for line in file:
+            if line.rstrip(b"\r\n") == b"":
+                if start is not None:
+                    layouts.append((start, count))
+                    start = None
+            elif not line.startswith(b"#"):
+                if start is None:
+                    start = offset
+                    count = 0
+                count += 1
+            elif start is not None:
+                count += 1
+            offset += len(line)
+    if start is not None:
+        layouts.append((start, count))
+    return layouts
+
+
+class MazePack:
+    def __init__(self, source):
+        """
+        :param source: list of layouts such as maze_grids.maze_layouts or the
+        name of a pack file or directory
+        raises OSError if the pack cannot be read and MazeError (a ValueError)
+        if it holds no layouts or a layout cannot be played when it is loaded
+        """
+        self.layouts = None
+        self.file_name = None
+        self.files = None
+        self.places = None
+        if isinstance(source, (str, os.PathLike)):
+            if os.path.isdir(source):
+                self.files = sorted(os.path.join(source, name) for name in os.listdir(source)
+                                    if name.endswith(".txt"))
+                self.name = os.path.basename(os.path.normpath(source))
+            else:
+                self.file_name = source
+                self.places = index_pack_file(source)
+                self.name = os.path.splitext(os.path.basename(source))[0]
+        else:
+            self.layouts = source
+            self.name = "built in"
+        if len(self) == 0:
+            raise MazeError(f"maze pack {self.name} has no layouts")
+        # MazeLevel of each loaded layout keyed by index
+        self.levels = {}
+        # threads loading layouts keyed by index and the error if a layout could not be loaded
+        self.loading = {}
+        self.errors = {}
+        self.lock = threading.Lock()
+
+    def __len__(self):
+        if self.layouts is not None:
+            return len(self.layouts)
+        if self.files is not None:
+            return len(self.files)
+        return len(self.places)
+
+    def layout_for_level(self, level):
+        # index of the layout played on the level - the layouts are repeated after the last
+        return (level - 1) % len(self)
+
+    def read_maze(self, layout):
+        # Rows of the layout from the pack
+        if self.layouts is not None:
+            return self.layouts[layout]
+        if self.files is not None:
+            with open(self.files[layout], encoding="utf-8") as file:
+                return read_layout(file)
+        offset, count = self.places[layout]
+        with open(self.file_name, encoding="utf-8", newline="") as file:
+            file.seek(offset)
+            return read_layout(file.readline() for _ in range(count))
+
+    def check(self):
+        """
+        Check every layout of the pack can be played - reads the whole pack so is
+        for checking a pack before it is played rather than when it is opened
+        :return: list of MazeError for the layouts that cannot be played
+        """
+        errors = []
+        for layout in range(len(self)):
+            try:
+                validate_maze(self.read_maze(layout), f"{self.name} layout {layout + 1}")
+            except MazeError as error:
+                errors.append(error)
+        return errors
+
+    def load(self, layout):
+        # Read, check and compile a layout from an external pack - no pygame
+        # so it can be run on the prefetch thread
+        maze = self.read_maze(layout)
+        nav = validate_maze(maze, f"{self.name} layout {layout + 1}")
+        return MazeLevel(layout, maze, nav, LevelTemplate(maze), PathMap(nav))
+
+    def load_in_background(self, layout):
+        try:
+            level = self.load(layout)
+        except Exception as error:
+            with self.lock:
+                self.errors[layout] = error
+        else:
+            with self.lock:
+                self.levels[layout] = level
+
+    def prefetch(self, layout):
+        # Start loading a layout on a background thread if not already loaded
+        if self.layouts is not None:
+            return
+        with self.lock:
+            if layout in self.levels or layout in self.loading:
+                return
+            thread = threading.Thread(target=self.load_in_background, args=(layout,), daemon=True)
+            self.loading[layout] = thread
+        thread.start()
+
+    def level(self, layout):
+        """
+        :return: MazeLevel of the layout - waits for it if it is being loaded
+        and loads it now if not prefetched. Other layouts except the next are
+        dropped.
+        raises MazeError if the layout cannot be played
+        """
+        if self.layouts is not None:
+            # the built in layouts are compiled once and shared by every game
+            level = self.levels.get(layout)
+            if level is None:
+                maze = self.layouts[layout]
+                level = MazeLevel(layout, maze, get_nav_graph(layout, maze),
+                                  get_level_template(layout, maze), get_path_map(layout, maze))
+                self.levels[layout] = level
+            return level
+        with self.lock:
+            thread = self.loading.pop(layout, None)
+        if thread is not None:
+            thread.join()
+        with self.lock:
+            error = self.errors.pop(layout, None)
+            level = self.levels.get(layout)
+        if error is not None:
+            raise error
+        if level is None:
+            level = self.load(layout)
+        next_layout = (layout + 1) % len(self)
+        with self.lock:
+            self.levels = {index: loaded for index, loaded in self.levels.items()
+                           if index == next_layout}
+            self.levels[layout] = level
+        return level
+
+    def get_background(self, level):
+        # pygame surface of the walls of a MazeLevel - drawn the first time the level
+        # is shown, in the display's pixel format so the blit is a straight copy
+        # call from the display thread
+        if self.layouts is not None:
+            # the built in layouts share brick.background_cache
+            from brick import get_maze_background
+            return get_maze_background(level.layout, level.maze, (WIDTH, HEIGHT))
+        if level.background is None:
+            import pygame
+            from brick import draw_maze_background, brick_styles
+            level.background = draw_maze_background(level.layout % brick_styles, level.maze, (WIDTH, HEIGHT))
+            if pygame.display.get_surface() is not None:
+                level.background = level.background.convert()
+        return level.background
+
+if __name__ == "__main__":
+    import sys
+    if len(sys.argv) < 2:
+        print("usage: python maze_pack.py pack_file_or_directory ...")
+        sys.exit(2)
+    failed = False
+    for source in sys.argv[1:]:
+        try:
+            pack = MazePack(source)
+            errors = pack.check()
+        except (OSError, MazeError) as error:
+            print(error)
+            failed = True
+            continue
+        for error in errors:
+            print(error)
+        failed |= bool(errors)
+        print(f"{source}: {len(pack) - len(errors)} of {len(pack)} layouts OK")
+    sys.exit(1 if failed else 0)
@@ -0,0 +1,143 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+NavGraph class - the maze compiled into walkable cells, the exits from each
+cell and a graph of the junctions joined by corridors. Built once per maze
+layout and reused on later levels.
+"""
+
+from collections import deque
+from constants import *
+from wall_map import WallMap
+
+# Grid step for each direction
+nav_step = {UP: (0, -1), LEFT: (-1, 0), DOWN: (0, 1), RIGHT: (1, 0)}
+opposite = {UP: DOWN, DOWN: UP, LEFT: RIGHT, RIGHT: LEFT}
+
+# Nav graphs keyed by maze layout index
+nav_cache = {}
+
+
+def exit_bit(direction):
+    # bit set in a cell's exits when the object can leave the cell in direction
+    return 1 << direction
+
+
+def get_nav_graph(layout, maze):
+    # return the nav graph for the maze layout - built the first time the layout is used
+    nav = nav_cache.get(layout)
+    if nav is None:
+        nav = NavGraph(maze)
+        nav_cache[layout] = nav
+    return nav
+
+
+class NavGraph:
+    def __init__(self, maze=None, compiled=None):
+        """
+        :param maze: list of row strings to compile
+        :param compiled: CompiledMaze (see maze_compiler.py) to take the walls and exits from
+        in place of compiling the maze
+        """
+        self.walls = WallMap()
+        if compiled is None:
+            self.walls.build(maze)
+        else:
+            self.walls.columns = compiled.columns
+            self.walls.rows = compiled.rows
+            self.walls.cells = bytearray(compiled.walls)
+        self.columns = self.walls.columns
+        self.rows = self.walls.rows
+        cells = self.columns * self.rows
+        # the pen opening is a wall to everyone - ghosts jump from the pen
+        # to Blinky's start position when released
+        self.walkable = [not wall for wall in self.walls.cells]
+        # exit bits and (direction, cell) neighbours of each walkable cell
+        # the tunnel wraps from one side of the maze to the other
+        self.neighbours = [[] for _ in range(cells)]
+        if compiled is None:
+            self.exits = bytearray(cells)
+            for index in range(cells):
+                if not self.walkable[index]:
+                    continue
+                for direction, next_index in self.find_neighbours(index):
+                    self.exits[index] |= exit_bit(direction)
+                    self.neighbours[index].append((direction, next_index))
+        else:
+            self.exits = bytearray(compiled.exits)
+            for index in range(cells):
+                if self.exits[index]:
+                    self.neighbours[index] = self.exit_neighbours(index)
+        # junctions are the cells where an object can choose its way (or must turn back)
+        # in the other walkable cells there is only the way on along the corridor or back
+        self.junction = [self.walkable[index] and len(self.neighbours[index]) != 2 for index in range(cells)]
+        self.junctions = [index for index in range(cells) if self.junction[index]]
+        # corridors leaving each junction: junction -> list of (direction, junction reached, length in cells)
+        self.edges = {}
+        for junction in self.junctions:
+            self.edges[junction] = [(direction,) + self.follow_corridor(direction, next_index)
+                                    for direction, next_index in self.neighbours[junction]]
+        # region of each walkable cell - there is no way between cells in different
+        # regions (the inside of the pen is closed off by the pen opening)
+        self.region = [-1] * cells
+        for start in range(cells):
+            if self.walkable[start] and self.region[start] == -1:
+                self.region[start] = start
+                queue = deque([start])
+                while queue:
+                    index = queue.popleft()
+                    for direction, next_index in self.neighbours[index]:
+                        if self.region[next_index] == -1:
+                            self.region[next_index] = start
+                            queue.append(next_index)
+
+    def find_neighbours(self, index):
+        col = index % self.columns
+        row = index // self.columns
+        found = []
+        for direction, (dx, dy) in nav_step.items():
+            next_col = (col + dx) % self.columns
+            next_row = row + dy
+            if 0 <= next_row < self.rows:
+                next_index = next_row * self.columns + next_col
+                if self.walkable[next_index]:
+                    found.append((direction, next_index))
+        return found
+
+    def follow_corridor(self, direction, index):
+        # follow the corridor round any bends until the next junction
+        # return the junction reached and the length in cells
+        length = 1
+        while not self.junction[index] and length <= len(self.walkable):
+            for next_direction, next_index in self.neighbours[index]:
+                if next_direction != opposite[direction]:
+                    direction = next_direction
+                    index = next_index
+                    break
+            length += 1
+        return index, length
+
+    def exit_neighbours(self, index):
+        # (direction, cell) of each exit set in the cell's exit bits - in the order of find_neighbours
+        col = index % self.columns
+        row = index // self.columns
+        exits = self.exits[index]
+        found = []
+        for direction, (dx, dy) in nav_step.items():
+            if exits & exit_bit(direction):
+                found.append((direction, (row + dy) * self.columns + (col + dx) % self.columns))
+        return found
+
+    def can_exit(self, col, row, direction):
+        """
+        :return: True if the cell is walkable and has an exit in direction
+        Cells outside the maze (the tunnel exits) have no exits
+        """
+        if 0 <= col < self.columns and 0 <= row < self.rows:
+            return self.exits[row * self.columns + col] & exit_bit(direction) != 0
+        return False
+
+    def is_walkable(self, col, row):
+        if 0 <= col < self.columns and 0 <= row < self.rows:
+            return self.walkable[row * self.columns + col]
+        return False
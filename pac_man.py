@@ -4,43 +4,47 @@ PacMan game developed using PyGame
 PacMan class and functions
 """
 
-import pygame
 from constants import *
 from game_sprite import GameSprite
-
-pygame.init()
+from assets import image
 
 # Speed reached at level 6 and above
 player_max_speed = 3.66
 # Timer used to display packman animation on caught
 caught_timer_default = int(FRAME_REFRESH * 1.5)
 
-life_lost = pygame.mixer.Sound('sounds/lifeLost.wav')
-pacman_whole = pygame.image.load('images/pacWhole.png')
-
 pacman_moving = [
-    pygame.image.load('images/pacOpenLeft.png'),
-    pygame.image.load('images/pacOpenRight.png'),
-    pygame.image.load('images/pacOpenUp.png'),
-    pygame.image.load('images/pacOpenDown.png')
+    'pacOpenLeft.png',
+    'pacOpenRight.png',
+    'pacOpenUp.png',
+    'pacOpenDown.png'
 ]
 
 caught_image = [
-    pygame.image.load('images/lost1.png'),
-    pygame.image.load('images/lost2.png'),
-    pygame.image.load('images/lost3.png'),
-    pygame.image.load('images/lost4.png'),
-    pygame.image.load('images/lost5.png'),
-    pygame.image.load('images/lost6.png')
+    'lost1.png',
+    'lost2.png',
+    'lost3.png',
+    'lost4.png',
+    'lost5.png',
+    'lost6.png'
 ]
 
 
 class PacMan(GameSprite):
+    __slots__ = ("whole", "start_position", "speed", "speed_for_level", "_caught", "caught_timer",
+                 "frame_count", "current_direction", "change_direction")
+
     def __init__(self, x, y):
-        # initialise positioned offset 10 to left to center between bricks
+        super().__init__(image('pacWhole.png'), 0, 0)
+        self.reset(x, y)
+
+    def reset(self, x, y):
+        # Set up at grid position x, y for a new level - pacman is reused from level to level
+        # positioned offset 10 to left to center between bricks
         x = x * 20 + 10
         y = y * 20 + 40
-        super().__init__(pacman_whole, x, y)
+        self.place(x, y)
+        self.image = image('pacWhole.png')
         # True when whole image displayed
         self.whole = True
         self.start_position = (x, y)
@@ -61,9 +65,8 @@ class PacMan(GameSprite):
     def set_caught(self):
         # PacMan has been caught so start animation
         self._caught = True
-        life_lost.play()
         self.caught_timer = caught_timer_default
-        self.image = pacman_whole
+        self.image = image('pacWhole.png')
         self.whole = True
 
     def caught(self):
@@ -75,7 +78,7 @@ class PacMan(GameSprite):
         self.y = self.start_position[1]
         self.speed = self.speed_for_level
         self.current_direction = HOLD
-        self.image = pacman_whole
+        self.image = image('pacWhole.png')
         self.whole = True
         self._caught = False
         self.done = False
@@ -87,19 +90,19 @@ class PacMan(GameSprite):
             if self.caught_timer <= -6:
                 self.done = True
             elif self.caught_timer % 6 == 0:
-                self.image = caught_image[5 - self.caught_timer // 15]
+                self.image = image(caught_image[5 - self.caught_timer // 15])
         else:
             # Set image
             if self.current_direction == HOLD:
-                self.image = pacman_whole
+                self.image = image('pacWhole.png')
             else:
                 self.frame_count += 1
                 if self.frame_count > 10 or self.change_direction:
                     self.frame_count = 0
                     self.change_direction = False
                     if self.whole:
-                        self.image = pacman_moving[self.current_direction - 1]
+                        self.image = image(pacman_moving[self.current_direction - 1])
                         self.whole = False
                     else:
-                        self.image = pacman_whole
+                        self.image = image('pacWhole.png')
                         self.whole = True
@@ -0,0 +1,131 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+PathMap class - distances through the maze used by the ghosts to find the
+shortest route to their target. Built once per maze layout.
+"""
+
+from collections import deque
+from constants import *
+from wall_map import X_OFFSET, Y_OFFSET
+from nav_graph import get_nav_graph, nav_step, opposite
+
+# Order directions are tried in (the order of the nav graph neighbours)
+# the first of equal routes is taken
+path_directions = list(nav_step)
+
+# Distance used for cells that cannot be reached
+UNREACHABLE = -1
+
+# Path maps keyed by maze layout index
+path_cache = {}
+
+
+def get_path_map(layout, maze):
+    # return the path map for the maze layout - built the first time the layout is used
+    path_map = path_cache.get(layout)
+    if path_map is None:
+        path_map = PathMap(get_nav_graph(layout, maze))
+        path_cache[layout] = path_map
+    return path_map
+
+
+class PathMap:
+    def __init__(self, nav):
+        """
+        :param nav: NavGraph of the maze
+        """
+        self.columns = nav.columns
+        self.rows = nav.rows
+        cells = self.columns * self.rows
+        self.open = nav.walkable
+        # for each open cell a list of (direction, neighbouring open cell)
+        # in path_directions order - the tunnel wraps from one side of the maze to the other
+        self.neighbours = nav.neighbours
+        # a route is only looked up at the junctions - and only to a target in the same region
+        self.junction = nav.junction
+        self.region = nav.region
+        # nearest open cell to every cell so a target in a wall or off the
+        # maze is moved to the closest corridor
+        self.nearest = [UNREACHABLE] * cells
+        queue = deque()
+        for index in range(cells):
+            if self.open[index]:
+                self.nearest[index] = index
+                queue.append(index)
+        while queue:
+            index = queue.popleft()
+            col = index % self.columns
+            row = index // self.columns
+            for dx, dy in nav_step.values():
+                next_col = col + dx
+                next_row = row + dy
+                if 0 <= next_col < self.columns and 0 <= next_row < self.rows:
+                    next_index = next_row * self.columns + next_col
+                    if self.nearest[next_index] == UNREACHABLE:
+                        self.nearest[next_index] = self.nearest[index]
+                        queue.append(next_index)
+        # distance from every cell to a target cell - calculated when a target is first used
+        self.fields = {}
+
+    def cell_index(self, x, y):
+        # index of the grid cell nearest to the screen position - clamped to the maze
+        col = int((x - X_OFFSET + GRID_WIDTH / 2) // GRID_WIDTH)
+        row = int((y - Y_OFFSET + GRID_WIDTH / 2) // GRID_WIDTH)
+        col = min(max(col, 0), self.columns - 1)
+        row = min(max(row, 0), self.rows - 1)
+        return row * self.columns + col
+
+    def distances(self, target):
+        """
+        :param target: index of an open cell
+        :return: list of the distance in cells from each cell to the target
+        """
+        field = self.fields.get(target)
+        if field is None:
+            field = [UNREACHABLE] * len(self.open)
+            field[target] = 0
+            queue = deque([target])
+            while queue:
+                index = queue.popleft()
+                distance = field[index] + 1
+                for direction, next_index in self.neighbours[index]:
+                    if field[next_index] == UNREACHABLE:
+                        field[next_index] = distance
+                        queue.append(next_index)
+            self.fields[target] = field
+        return field
+
+    def direction_to(self, x, y, target, current_direction):
+        """
+        Choose the direction to leave the cell at (x, y) on the shortest route to target
+        The ghost only turns back if there is no other way out of the cell so between
+        junctions it follows the corridor and the distances are only needed at a junction
+        :param target: (x, y) screen position
+        :return: direction or None if no route found
+        """
+        col = int((x - X_OFFSET + GRID_WIDTH / 2) // GRID_WIDTH) % self.columns
+        row = int((y - Y_OFFSET + GRID_WIDTH / 2) // GRID_WIDTH)
+        if row < 0 or row >= self.rows:
+            return None
+        index = row * self.columns + col
+        if not self.open[index]:
+            return None
+        target = self.nearest[self.cell_index(target[0], target[1])]
+        if self.region[target] != self.region[index]:
+            return None
+        ways = [way for way in self.neighbours[index] if way[0] != opposite.get(current_direction)]
+        if not ways:
+            ways = self.neighbours[index]
+        if len(ways) == 1 and not self.junction[index]:
+            # moving along a corridor - the only way on
+            return ways[0][0]
+        field = self.distances(target)
+        best = None
+        best_distance = 0
+        for direction, next_index in ways:
+            distance = field[next_index]
+            if distance != UNREACHABLE and (best is None or distance < best_distance):
+                best = direction
+                best_distance = distance
+        return best
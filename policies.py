@@ -0,0 +1,96 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Player policies used to drive a GameState without a keyboard
+Each policy returns the direction to select for the next frame
+"""
+
+import random
+from collections import deque
+from constants import *
+
+# Grid step for each direction
+direction_step = [
+    (LEFT, -1, 0),
+    (RIGHT, 1, 0),
+    (UP, 0, -1),
+    (DOWN, 0, 1)
+]
+
+
+def pacman_cell(pacman):
+    # grid cell nearest to pacman's position
+    return int(round((pacman.x - 20) / 20)), int(round((pacman.y - 40) / 20))
+
+
+class RandomPolicy:
+    def __init__(self, seed=None, change_chance=0.05):
+        """
+        Keeps moving in one direction and picks a new random direction now and then
+        :param seed: random seed for the policy
+        :param change_chance: chance of selecting a new direction each frame
+        """
+        self.random = random.Random(seed)
+        self.change_chance = change_chance
+        self.direction = LEFT
+
+    def next_direction(self, game):
+        if self.random.random() < self.change_chance:
+            self.direction = self.random.choice([LEFT, RIGHT, UP, DOWN])
+        return self.direction
+
+
+class GreedyPolicy:
+    def __init__(self, seed=None, wander=0.1):
+        """
+        Heads for the nearest dot or fruit by a breadth first search of the maze
+        :param seed: random seed for the policy
+        :param wander: chance of a random direction each frame so pacman cannot get stuck
+        """
+        self.random = random.Random(seed)
+        self.wander = wander
+
+    def next_direction(self, game):
+        if self.random.random() < self.wander:
+            return self.random.choice([LEFT, RIGHT, UP, DOWN])
+        walls = game.walls
+        targets = game.dots
+        start = pacman_cell(game.pacman)
+        # cell: (previous cell, direction taken from previous cell)
+        came_from = {start: None}
+        queue = deque([start])
+        while queue:
+            cell = queue.popleft()
+            if cell in targets and cell != start:
+                # walk back to the first step
+                while came_from[cell][0] != start:
+                    cell = came_from[cell][0]
+                return came_from[cell][1]
+            for direction, dx, dy in direction_step:
+                # columns wrap through the tunnel
+                next_cell = ((cell[0] + dx) % walls.columns, cell[1] + dy)
+                if next_cell in came_from or not 0 <= next_cell[1] < walls.rows:
+                    continue
+                if walls.is_wall(next_cell[0], next_cell[1]):
+                    continue
+                came_from[next_cell] = (cell, direction)
+                queue.append(next_cell)
+        return HOLD
+
+
+class ReplayPolicy:
+    def __init__(self, directions):
+        """
+        Replays a scripted list of directions - HOLD once the script runs out
+        :param directions: list of directions, one per frame (e.g. from Replay.directions)
+        """
+        self.directions = directions
+        self.frame = 0
+
+    def next_direction(self, game):
+        if self.frame >= len(self.directions):
+            return HOLD
+        direction = self.directions[self.frame]
+        self.frame += 1
+        return direction
+
@@ -0,0 +1,78 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Replay class - a game recorded as its random seed, the maze pack played and
+the direction selected each frame, stored run-length encoded. Played back by
+replay_player.py
+"""
+
+# First line of a replay file - version 1 files have no pack line
+replay_header = "maze-man replay 2"
+replay_headers = ["maze-man replay 1", replay_header]
+# Character used in replay files for each direction
+replay_chars = ".LRUD"
+
+
+class Replay:
+    def __init__(self, seed, pack=None):
+        """
+        :param seed: seed the game was started with
+        :param pack: file or directory of the maze pack played - None for the built in layouts
+        """
+        self.seed = seed
+        self.pack = pack
+        # list of [direction, number of frames]
+        self.runs = []
+        self.frames = 0
+        # result of the game - set when recording finished
+        self.score = None
+        self.level = None
+
+    def record(self, direction):
+        # add the direction selected for the next frame
+        if self.runs and self.runs[-1][0] == direction:
+            self.runs[-1][1] += 1
+        else:
+            self.runs.append([direction, 1])
+        self.frames += 1
+
+    def finish(self, game):
+        # record the result of the game
+        self.score = game.score_board.score
+        self.level = game.score_board.level
+
+    def directions(self):
+        # the direction for each frame in turn
+        for direction, count in self.runs:
+            for _ in range(count):
+                yield direction
+
+    def save(self, file_name):
+        runs = " ".join(replay_chars[direction] + str(count) for direction, count in self.runs)
+        with open(file_name, "w") as file:
+            file.write(replay_header + "\n")
+            file.write(f"seed {self.seed}\n")
+            if self.pack is not None:
+                file.write(f"pack {self.pack}\n")
+            file.write(f"score {self.score} level {self.level} frames {self.frames}\n")
+            file.write(runs + "\n")
+
+    @staticmethod
+    def load(file_name):
+        with open(file_name) as file:
+            lines = file.read().split("\n")
+        if lines[0] not in replay_headers:
+            raise ValueError(str(file_name) + " is not a replay file")
+        replay = Replay(int(lines[1].split()[1]))
+        line = 2
+        if lines[line].startswith("pack "):
+            replay.pack = lines[line][len("pack "):]
+            line += 1
+        result = lines[line].split()
+        if result[1] != "None":
+            replay.score = int(result[1])
+            replay.level = int(result[3])
+        for run in " ".join(lines[line + 1:]).split():
+            replay.runs.append([replay_chars.index(run[0]), int(run[1:])])
+            replay.frames += int(run[1:])
+        return replay
@@ -0,0 +1,61 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Plays recorded games back without a window as fast as possible and checks
+the final score and level, so a game can be reproduced exactly.
+
+    python replay_player.py last_game.replay
+"""
+
+import os
+# No window or sound needed - set before pygame is imported
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import sys
+from game_state import GameState
+from maze_pack import MazePack
+from replay import Replay
+
+
+def play_replay(replay):
+    """
+    Re-run a recorded game without a window - with the maze pack it was played with
+    :return: the GameState at the end of the replay
+    """
+    maze_pack = MazePack(replay.pack) if replay.pack is not None else None
+    game = GameState(maze_pack=maze_pack, sound_on=False)
+    game.new_game(replay.seed)
+    game.start_play()
+    for direction in replay.directions():
+        game.update(direction)
+    return game
+
+
+def check_replay(replay):
+    """
+    :return: True if playing the replay gives the recorded score and level
+    """
+    game = play_replay(replay)
+    return game.score_board.score == replay.score and game.score_board.level == replay.level
+
+
+def main():
+    if len(sys.argv) < 2:
+        print("usage: python replay_player.py replay_file ...")
+        sys.exit(2)
+    failed = False
+    for file_name in sys.argv[1:]:
+        replay = Replay.load(file_name)
+        game = play_replay(replay)
+        score = game.score_board.score
+        level = game.score_board.level
+        ok = score == replay.score and level == replay.level
+        failed |= not ok
+        print(f"{file_name}: {replay.frames} frames score {score} level {level}"
+              f" - {'OK' if ok else f'expected score {replay.score} level {replay.level}'}")
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,22 +1,23 @@
 """
 Author Paul Brace April 2024
 ScoreBoard class for Maze-Man game
+pygame and the fonts are loaded when first drawn so the score can be kept
+without a display
 """
 
-import pygame
+from functools import lru_cache
 from constants import *
-
-pygame.init()
-font = "veranda"
-heading = pygame.font.SysFont(font, 50, False, False)
-text = pygame.font.SysFont(font, 30, False, False)
-info_text = pygame.font.SysFont(font, 25, False, False)
-italic = pygame.font.SysFont(font, 30, False, True)
-bold = pygame.font.SysFont(font, 30, True, False)
-small = pygame.font.SysFont(font, 20, False, False)
-scores = pygame.font.SysFont("freesans", 15, True, False)
-
-extra_life = pygame.mixer.Sound('sounds/extraLife.wav')
+from assets import image, font
+
+# Fonts as (name, size, bold, italic) - created by assets.font on first use
+font_name = "veranda"
+heading = (font_name, 50, False, False)
+text = (font_name, 30, False, False)
+info_text = (font_name, 25, False, False)
+italic = (font_name, 30, False, True)
+bold = (font_name, 30, True, False)
+small = (font_name, 20, False, False)
+scores = ("freesans", 15, True, False)
 
 instructions = [
     "Press left, right, up and down arrows to move",
@@ -50,6 +51,12 @@ further_info = [
     "You get an extra life every 10,000 points - max 5 at any time."]
 
 
+@lru_cache(maxsize=256)
+def render_label(text, label_font, color):
+    # Rendered text is cached so labels are only rendered when their text changes
+    return font(*label_font).render(text, False, color)
+
+
 class ScoreBoard:
     def __init__(self):
         self.score = 0
@@ -66,10 +73,11 @@ class ScoreBoard:
         self.display_new_life = False
         self.level = 1
         self.lives = 0
-        self.life_image = pygame.image.load('images/pacOpen.png')
         self.game_state = PAUSED
         # 2 possible pages of instruction/information
         self.inst_page = 1
+        # Pre-rendered instruction/information pages
+        self.pages = {}
 
     def load_high_score(self):
         try:
@@ -79,16 +87,28 @@ class ScoreBoard:
             self.high_score = 0
 
     def draw_text(self, screen, text, pos, font, color):
-        label = font.render(text, False, color)
+        label = render_label(text, font, color)
         screen.blit(label, pos)
         return label.get_height() * 2
 
     def draw_text_center(self, screen, text, pos, font, color):
-        label = font.render(text, False, color)
+        label = render_label(text, font, color)
         cent_pos = (pos[0] - label.get_width() / 2, pos[1])
         screen.blit(label, cent_pos)
         return label.get_height() * 2
 
+    def update(self):
+        # Count down the catch score and new life messages
+        # called once per game update so they last the same time at any frame rate
+        if self.display_catch_score:
+            self.catch_timer -= 1
+            if self.catch_timer <= 0:
+                self.display_catch_score = False
+        if self.display_new_life:
+            self.new_life_timer -= 1
+            if self.new_life_timer <= 0:
+                self.display_new_life = False
+
     def draw(self, screen):
         self.draw_text(screen, f"Your score: {self.score}", (20, 10),
                          scores,"white"),
@@ -98,7 +118,7 @@ class ScoreBoard:
                          scores, "white")
         # draw an image for each life remaining
         for i in range(self.lives):
-            screen.blit(self.life_image, (i * 25 + 30, HEIGHT - 30))
+            screen.blit(image('pacOpen.png'), (i * 25 + 30, HEIGHT - 30))
         # check if last catch score to be displayed
         if self.display_catch_score:
             self.show_catch_score(screen)
@@ -128,6 +148,7 @@ class ScoreBoard:
                               text, "aqua")
         self.draw_text_center(screen, "Author: Paul Brace 2024", (CENTER, 550),
                               small, "white")
+        import pygame
         keys = pygame.key.get_pressed()
         if keys[pygame.K_SPACE]:
             return START, SILENT
@@ -137,9 +158,30 @@ class ScoreBoard:
             return WAIT, SILENT
 
     def draw_game_instructions(self, screen):
-        # fill the screen with black to clear last frame
+        # The pages are static so are rendered once and then copied to the screen
+        page_number = 1 if self.inst_page == 1 else 2
+        page = self.pages.get(page_number)
+        if page is None:
+            page = self.render_page(page_number)
+            self.pages[page_number] = page
+        screen.blit(page, (0, 0))
+
+        import pygame
+        keys = pygame.key.get_pressed()
+        if keys[pygame.K_SPACE]:
+            return START, SILENT
+        elif keys[pygame.K_m]:
+            return START, MUSIC
+        elif keys[pygame.K_i]:
+            self.inst_page += 1
+        return WAIT, SILENT
+
+    def render_page(self, page_number):
+        # Draw an instruction/information page on a new surface
+        import pygame
+        screen = pygame.Surface((WIDTH, HEIGHT))
         screen.fill("black")
-        if self.inst_page == 1:
+        if page_number == 1:
             y = 50
             y += self.draw_text_center(screen, "Maze-Man - Instructions",  (CENTER, y),
                                   heading, "yellow")
@@ -166,15 +208,19 @@ class ScoreBoard:
                                   text, "aqua")
             self.draw_text_center(screen, "Author: Paul Brace 2024", (CENTER, 660),
                                   small, "white")
+        if pygame.display.get_surface() is not None:
+            screen = screen.convert()
+        return screen
 
-        keys = pygame.key.get_pressed()
-        if keys[pygame.K_SPACE]:
-            return START, SILENT
-        elif keys[pygame.K_m]:
-            return START, MUSIC
-        elif keys[pygame.K_i]:
-            self.inst_page += 1
-        return WAIT, SILENT
+    def draw_loading(self, screen):
+        self.draw_text_center(screen, "Loading sounds...", (CENTER, 10),
+                              small, "grey")
+
+    def draw_maze_error(self, screen, error):
+        self.draw_text_center(screen, "The next maze could not be loaded", (CENTER, 160),
+                              small, "red")
+        self.draw_text_center(screen, str(error), (CENTER, 185),
+                              small, "red")
 
     def draw_level_over(self, screen):
         self.draw_text_center(screen, "Level Completed", (CENTER, 300),
@@ -187,24 +233,18 @@ class ScoreBoard:
         self.display_catch_score = True
 
     def show_catch_score(self, screen):
-        self.catch_timer -= 1
-        if self.catch_timer <= 0:
-            self.display_catch_score = False
-            return
         self.draw_text_center(screen, f"{self.catch_score}", self.catch_position,
                               small, "white")
 
     def set_new_life(self):
+        # return True if a life was added
         if self.lives < 5:
             self.lives += 1
             self.new_life_timer = NEW_LIFE_TIMER
             self.display_new_life = True
-            extra_life.play()
+            return True
+        return False
 
     def show_new_life(self, screen):
-        self.new_life_timer -= 1
-        if self.new_life_timer <= 0:
-            self.display_new_life = False
-            return
         self.draw_text_center(screen, "Extra life added", (CENTER, HEIGHT - 30),
                               text, "red")
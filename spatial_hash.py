@@ -0,0 +1,143 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+SpatialHash class - the moving sprites held in a uniform grid of cells so a
+collision test only looks at the sprites in the cells around the sprite
+rather than every sprite. Sprites are moved to a new cell only when they
+cross a cell edge so the cost of a test stays the same however many
+ghosts (or players) are in the maze. With only a few sprites (a normal
+game's Pac-Man and 4 ghosts) looking up the cells costs more than testing
+every sprite so they are not held in cells until there are more than
+direct_count.
+"""
+
+# Most sprites tested one against another without the cells
+direct_count = 7
+
+
+class SpatialHash:
+    def __init__(self, cell_size):
+        """
+        :param cell_size: width and height of a cell - at least the width and height
+        of the largest sprite so colliding sprites are always in neighbouring cells
+        """
+        self.cell_size = cell_size
+        # sprites in each cell keyed by (column, row) - empty while there are direct_count or fewer sprites
+        self.cells = {}
+        # cell of each sprite and the order the sprites were added - results are returned in that order
+        self.cell_of = {}
+        self.order_of = {}
+        self.added = 0
+
+    def cell(self, sprite):
+        # (column, row) of the cell holding the sprite's center
+        # positions are compared as collide_rect compares them - without the sign
+        size = self.cell_size
+        return int(abs(sprite.x) // size), int(abs(sprite.y) // size)
+
+    def add(self, sprite):
+        if sprite.width > self.cell_size or sprite.height > self.cell_size:
+            raise ValueError(f"sprite of {sprite.width} x {sprite.height} is larger than a cell")
+        self.order_of[sprite] = self.added
+        self.added += 1
+        if len(self.order_of) > direct_count:
+            if self.cell_of:
+                self.put(sprite)
+            else:
+                # too many to test directly - put every sprite in its cell
+                for held in self.order_of:
+                    self.put(held)
+
+    def put(self, sprite):
+        cell = self.cell(sprite)
+        self.cells.setdefault(cell, []).append(sprite)
+        self.cell_of[sprite] = cell
+
+    def remove(self, sprite):
+        del self.order_of[sprite]
+        if sprite in self.cell_of:
+            self.remove_from_cell(sprite, self.cell_of.pop(sprite))
+        if len(self.order_of) <= direct_count:
+            self.cells.clear()
+            self.cell_of.clear()
+
+    def remove_from_cell(self, sprite, cell):
+        sprites = self.cells[cell]
+        sprites.remove(sprite)
+        if not sprites:
+            del self.cells[cell]
+
+    def move(self, sprite):
+        # Call after the sprite has moved - it is only moved to another cell if it has left its cell
+        if not self.cell_of:
+            return
+        cell = self.cell(sprite)
+        old_cell = self.cell_of[sprite]
+        if cell != old_cell:
+            self.remove_from_cell(sprite, old_cell)
+            self.cells.setdefault(cell, []).append(sprite)
+            self.cell_of[sprite] = cell
+
+    def move_all(self, sprites):
+        # move for each sprite - the cell is worked out here as this is called every frame
+        cell_of = self.cell_of
+        if not cell_of:
+            return
+        size = self.cell_size
+        for sprite in sprites:
+            cell = (int(abs(sprite.x) // size), int(abs(sprite.y) // size))
+            old_cell = cell_of[sprite]
+            if cell != old_cell:
+                self.remove_from_cell(sprite, old_cell)
+                self.cells.setdefault(cell, []).append(sprite)
+                cell_of[sprite] = cell
+
+    def clear(self):
+        self.cells.clear()
+        self.cell_of.clear()
+        self.order_of.clear()
+        self.added = 0
+
+    def near(self, sprite):
+        """
+        :return: list of the other sprites in the cells around the sprite in the order added
+        every other sprite while there are too few to be held in cells
+        """
+        if not self.cell_of:
+            return [other for other in self.order_of if other is not sprite]
+        col, row = self.cell(sprite)
+        cells = self.cells
+        found = []
+        for y in (row - 1, row, row + 1):
+            for x in (col - 1, col, col + 1):
+                sprites = cells.get((x, y))
+                if sprites:
+                    found += sprites
+        if sprite in self.cell_of:
+            found.remove(sprite)
+        if len(found) > 1:
+            found.sort(key=self.order_of.__getitem__)
+        return found
+
+    def collisions(self, sprite):
+        """
+        :param sprite: GameSprite to test - need not be in the hash
+        :return: list of the sprites in the hash that collide with it in the order added
+        """
+        if not self.cell_of:
+            return [other for other in self.order_of if other is not sprite and sprite.collide_rect(other)]
+        return [other for other in self.near(sprite) if sprite.collide_rect(other)]
+
+    def pairs(self):
+        """
+        :return: list of (first, second) of every two sprites in the hash that collide
+        each pair once with first added before second
+        """
+        order_of = self.order_of
+        found = []
+        # sprites are held in order_of in the order added
+        for sprite, order in order_of.items():
+            for other in self.near(sprite):
+                if order_of[other] > order and sprite.collide_rect(other):
+                    found.append((sprite, other))
+        return found
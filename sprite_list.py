@@ -13,6 +13,14 @@ class SpriteList:
     def add(self, item):
         self.items.append(item)
 
+    # Iterate over the items in the order they were added
+    # items added during iteration are included
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
     # Draw all item on the screen
     def draw(self, screen):
         for item in self.items:
@@ -24,9 +32,16 @@ class SpriteList:
 
     # Delete all items where done flag is True
     def clear_done(self):
-        for item in self.items:
-            if item.done:
-                self.items.remove(item)
+        # Compact the list in place in a single pass keeping the draw order.
+        # Removing while iterating would skip the item after each one removed
+        # and each list.remove is O(n).
+        items = self.items
+        keep = 0
+        for item in items:
+            if not item.done:
+                items[keep] = item
+                keep += 1
+        del items[keep:]
 
     # Delete all items
     def clear_all(self):
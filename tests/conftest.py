@@ -0,0 +1,18 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Test set up - the game modules are imported from the game folder and run
+without a window or sound device
+"""
+
+import os
+import sys
+
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+os.environ.setdefault("PYGAME_HIDE_SUPPORT_PROMPT", "1")
+
+game_folder = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, game_folder)
+# the high scores are saved in the game folder
+os.chdir(game_folder)
@@ -0,0 +1,42 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Images and sounds are found from the game folder whatever the working
+directory and only images with an alpha channel keep it when converted
+"""
+
+import pygame
+import assets
+from constants import *
+from maze_compiler import content_hash
+from maze_grids import maze_layouts
+
+
+def fresh_images(monkeypatch):
+    # load the images again rather than use those already converted
+    monkeypatch.setattr(assets, "converted_images", {})
+    monkeypatch.setattr(assets, "loaded_images", {})
+
+
+def test_assets_found_from_another_directory(tmp_path, monkeypatch):
+    digest = content_hash(maze_layouts, True)
+    fresh_images(monkeypatch)
+    monkeypatch.chdir(tmp_path)
+    assert assets.image("BlinkyLeft.png").get_size() == (GRID_WIDTH, GRID_WIDTH)
+    # the brick images are part of the cache digest
+    assert content_hash(maze_layouts, True) == digest
+
+
+def test_only_images_with_alpha_are_converted_with_it(monkeypatch):
+    fresh_images(monkeypatch)
+    pygame.display.init()
+    pygame.display.set_mode((WIDTH, HEIGHT))
+    try:
+        # opaque sprites are a straight copy when blitted
+        for name in ("dot.png", "energiser.png", "BlinkyLeft.png", "brick0.png"):
+            img = assets.image(name)
+            assert not img.get_flags() & pygame.SRCALPHA
+            assert img.get_bitsize() == pygame.display.get_surface().get_bitsize()
+        assert assets.image("penOpening.png").get_flags() & pygame.SRCALPHA
+    finally:
+        pygame.display.quit()
@@ -0,0 +1,55 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+BatchSimulation plays the same games as GameState for the same player
+directions and random seeds - frame for frame
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from batch_simulation import BatchSimulation
+from game_state import GameState
+from policies import GreedyPolicy, RandomPolicy
+
+seeds = [3, 11, 2024]
+lives = 50
+
+
+def scalar_state(game):
+    score_board = game.score_board
+    return (score_board.score, score_board.level, score_board.lives,
+            game.pacman.x, game.pacman.y, [(ghost.x, ghost.y) for ghost in game.ghosts])
+
+
+def batch_state(batch, i):
+    return (int(batch.score[i]), int(batch.level[i]), int(batch.lives[i]),
+            float(batch.pacman_x[i]), float(batch.pacman_y[i]),
+            [(float(batch.ghost_x[i, ghost]), float(batch.ghost_y[i, ghost])) for ghost in range(4)])
+
+
+# GreedyPolicy plays long enough to clear a level - RandomPolicy loses lives and runs into walls
+@pytest.mark.parametrize("policy, frames", [(GreedyPolicy, 4500), (RandomPolicy, 2000)])
+def test_batch_matches_game_state(policy, frames):
+    batch = BatchSimulation(len(seeds), seeds)
+    batch.lives[:] = lives
+    games = []
+    for seed in seeds:
+        game = GameState(sound_on=False)
+        game.new_game(seed)
+        game.start_play()
+        game.score_board.lives = lives
+        games.append(game)
+    players = [policy(seed) for seed in seeds]
+    for frame in range(frames):
+        actions = [player.next_direction(game) for player, game in zip(players, games)]
+        for game, action in zip(games, actions):
+            game.update(action)
+        batch.step(actions)
+        for i, game in enumerate(games):
+            assert batch_state(batch, i) == scalar_state(game), f"game {i} frame {frame}"
+    if policy is GreedyPolicy:
+        assert max(batch.level) > 1
+    else:
+        assert min(batch.lives) < lives
@@ -0,0 +1,143 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Layouts checked before they are played and the compiled tables cache -
+rebuilt when a layout changes or the file is damaged
+"""
+
+import pytest
+import maze_compiler
+from maze_compiler import MazeError, validate_maze, compile_maze, content_hash, \
+    load_layouts, load_compiled, header, record, single_chars, min_dots
+from maze_grids import maze_layouts
+
+
+def find(maze, char):
+    # (column, row) of each char in the layout
+    return [(x, y) for y, row in enumerate(maze) for x, c in enumerate(row) if c == char]
+
+
+def replace(maze, cells, char):
+    # copy of the layout with the cells changed to char
+    rows = [list(row) for row in maze]
+    for x, y in cells:
+        rows[y][x] = char
+    return ["".join(row) for row in rows]
+
+
+def buried_wall(maze):
+    # a wall cell with walls all round it
+    for x, y in find(maze, "X"):
+        if 0 < y < len(maze) - 1 and 0 < x < len(maze[y]) - 1 and \
+                maze[y - 1][x] == maze[y + 1][x] == maze[y][x - 1] == maze[y][x + 1] == "X":
+            return x, y
+
+
+maze = maze_layouts[0]
+tunnel_row = next(y for y, row in enumerate(maze) if row[0] != "X")
+
+
+@pytest.mark.parametrize("layout", range(len(maze_layouts)))
+def test_built_in_layouts_are_valid(layout):
+    nav = validate_maze(maze_layouts[layout])
+    assert nav.rows == len(maze_layouts[layout])
+
+
+@pytest.mark.parametrize("bad, message", [
+    (maze[:-1], "has 30 rows - 31 expected"),
+    (maze[:4] + [maze[4][:-1]] + maze[5:], "row 4 has 27 columns - 28 expected"),
+    (replace(maze, find(maze, ".")[:1], "Z"), "unknown character 'Z'"),
+    (replace(maze, [(0, tunnel_row)], "X"), f"row {tunnel_row} is open at one side only"),
+    (replace(maze, find(maze, "O"), "X"), "has no pen opening 'O'"),
+    (replace(maze, find(maze, "E")[:1], "."), "has 3 energisers - 4 expected"),
+    (replace(maze, find(maze, ".")[min_dots - 1:], " "), f"has {min_dots - 1} dots - at least {min_dots} needed"),
+    (replace(maze, [buried_wall(maze)], "."), "'.' at column .* cannot be reached")
+])
+def test_validate_maze_errors(bad, message):
+    with pytest.raises(MazeError, match=message):
+        validate_maze(bad, "bad")
+
+
+@pytest.mark.parametrize("char", single_chars)
+def test_validate_maze_single_chars(char):
+    with pytest.raises(MazeError, match=f"has 2 '{char}' - 1 expected"):
+        validate_maze(replace(maze, find(maze, ".")[:1], char))
+    with pytest.raises(MazeError, match=f"has 0 '{char}' - 1 expected"):
+        validate_maze(replace(maze, find(maze, char), " "))
+
+
+def compiled_tables(compiled):
+    return (compiled.rows, compiled.columns, bytes(compiled.walls), bytes(compiled.exits),
+            compiled.dot_bits, compiled.energiser_bits, compiled.pacman_cell,
+            compiled.fruit_position, tuple(compiled.ghosts), compiled.maze)
+
+
+@pytest.mark.parametrize("background", [False, True])
+def test_cache_round_trip(tmp_path, background):
+    cache_file = str(tmp_path / "mazes.bin")
+    compiled = load_layouts(maze_layouts, cache_file, background)
+    loaded = load_compiled(cache_file, content_hash(maze_layouts, background))
+    assert loaded is not None
+    expected = [compile_maze(layout, i, background) for i, layout in enumerate(maze_layouts)]
+    for tables in (compiled, loaded):
+        assert [compiled_tables(item) for item in tables] == [compiled_tables(item) for item in expected]
+        assert [item.background is None for item in tables] == [not background] * len(maze_layouts)
+    if background:
+        assert bytes(loaded[0].background) == bytes(expected[0].background)
+
+
+def counting_compiles(monkeypatch):
+    # count the layouts compiled by load_layouts
+    compiled = []
+    compile_layout = maze_compiler.compile_maze
+
+    def counted(*args):
+        compiled.append(args[1])
+        return compile_layout(*args)
+    monkeypatch.setattr(maze_compiler, "compile_maze", counted)
+    return compiled
+
+
+def test_changed_layout_rebuilds_the_cache(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "mazes.bin")
+    compiled = counting_compiles(monkeypatch)
+    load_layouts(maze_layouts, cache_file, False)
+    assert compiled == [0, 1, 2, 3]
+    # up to date - nothing compiled
+    load_layouts(maze_layouts, cache_file, False)
+    assert compiled == [0, 1, 2, 3]
+    changed = [maze_layouts[0], replace(maze_layouts[1], find(maze_layouts[1], ".")[:1], " ")] + maze_layouts[2:]
+    assert content_hash(changed, False) != content_hash(maze_layouts, False)
+    assert load_compiled(cache_file, content_hash(changed, False)) is None
+    tables = load_layouts(changed, cache_file, False)
+    assert compiled == [0, 1, 2, 3] * 2
+    assert tables[1].dot_bits != compile_maze(maze_layouts[1], 1, False).dot_bits
+
+
+def test_damaged_cache_is_rebuilt(tmp_path, monkeypatch):
+    cache_file = str(tmp_path / "mazes.bin")
+    digest = content_hash(maze_layouts, False)
+    load_layouts(maze_layouts, cache_file, False)
+    with open(cache_file, "rb") as file:
+        data = file.read()
+    for size in (0, 10, header.size, header.size + record.size, 200, len(data) - 1):
+        with open(cache_file, "wb") as file:
+            file.write(data[:size])
+        assert load_compiled(cache_file, digest) is None
+    # a section offset outside the file
+    damaged = bytearray(data)
+    damaged[header.size + record.size - 8:header.size + record.size - 4] = (len(data) * 2).to_bytes(4, "little")
+    with open(cache_file, "wb") as file:
+        file.write(damaged)
+    assert load_compiled(cache_file, digest) is None
+    compiled = counting_compiles(monkeypatch)
+    load_layouts(maze_layouts, cache_file, False)
+    assert compiled == [0, 1, 2, 3]
+    assert load_compiled(cache_file, digest) is not None
+
+
+def test_cache_that_cannot_be_saved(tmp_path):
+    # the cache directory is a file - the layouts are played from memory
+    (tmp_path / "not_a_directory").write_text("")
+    tables = load_layouts(maze_layouts, str(tmp_path / "not_a_directory" / "mazes.bin"), False)
+    assert len(tables) == len(maze_layouts)
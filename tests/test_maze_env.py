@@ -0,0 +1,69 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+The single and vector environments give the same observations and rewards
+for the same seed and actions, and the observations kept up to date step by
+step match the game drawn again from scratch
+"""
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from dot import ENERGISER
+from maze_env import MazeManEnv, VectorMazeManEnv, observation_shape, grid_columns, grid_rows, grid_cell, \
+    ghost_mode_channel, WALLS, DOTS, ENERGISERS, FRUIT_CHANNEL, PACMAN
+from policies import GreedyPolicy
+
+seed = 2024
+lives = 50
+frame_skip = 3
+# steps to play past the first level change
+steps = 1500
+
+
+def scratch_observation(game):
+    # The observation drawn from the game without the planes kept by the environment
+    observation = np.zeros(observation_shape, dtype=np.uint8)
+    observation[WALLS] = np.array(list(game.walls.cells), dtype=np.uint8).reshape(grid_rows, grid_columns)
+    for y in range(grid_rows):
+        for x in range(grid_columns):
+            dot_type = game.dots.dot_type(x, y)
+            if dot_type is not None:
+                observation[ENERGISERS if dot_type == ENERGISER else DOTS, y, x] = 1
+    planes = observation.reshape(len(observation), -1)
+    planes[PACMAN, grid_cell(game.pacman.x, game.pacman.y)] = 1
+    for ghost in game.ghosts:
+        planes[ghost_mode_channel[ghost.mode], grid_cell(ghost.x, ghost.y)] = 1
+    for fruit in game.dots.fruit:
+        if not fruit.done:
+            planes[FRUIT_CHANNEL, grid_cell(fruit.x, fruit.y)] = 1
+    return observation
+
+
+def test_single_and_vector_envs_match():
+    env = MazeManEnv(frame_skip=frame_skip, life_penalty=100)
+    vector_env = VectorMazeManEnv(1, frame_skip=frame_skip, life_penalty=100)
+    observation, info = env.reset(seed=seed)
+    observations, infos = vector_env.reset(seed=seed)
+    env.game.score_board.lives = lives
+    vector_env.sim.lives[:] = lives
+    assert (observations[0] == observation).all()
+    assert (observation == scratch_observation(env.game)).all()
+    player = GreedyPolicy(seed)
+    levels = [info["level"]]
+    for step in range(steps):
+        action = player.next_direction(env.game)
+        observation, reward, terminated, truncated, info = env.step(action)
+        observations, rewards, terminateds, truncateds, infos = vector_env.step([action])
+        assert (observations[0] == observation).all(), f"step {step}"
+        assert rewards[0] == reward and terminateds[0] == terminated
+        assert infos["score"][0] == info["score"] and infos["level"][0] == info["level"]
+        # the planes kept up to date match the game drawn again - as dots are eaten and when the level changes
+        if info["level"] != levels[-1]:
+            levels.append(info["level"])
+            assert (observation == scratch_observation(env.game)).all(), f"step {step}"
+        elif step % 10 == 0:
+            assert (observation == scratch_observation(env.game)).all(), f"step {step}"
+    assert levels == [1, 2]
+    assert info["lives_lost"] > 0
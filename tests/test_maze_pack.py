@@ -0,0 +1,123 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Maze packs read from pack files and directories and a layout that cannot
+be played ending the game rather than crashing it
+"""
+
+import pytest
+import assets
+from constants import *
+from game_state import GameState
+from maze_compiler import MazeError
+from maze_grids import maze_layouts
+from maze_pack import MazePack, index_pack_file, read_layout
+from nav_graph import NavGraph
+
+
+def write_pack(path, layouts):
+    path.write_text("\n\n".join("\n".join(maze) for maze in layouts) + "\n")
+    return path
+
+
+def bad_layout():
+    maze = list(maze_layouts[1])
+    maze[5] = maze[5][:-1]
+    return maze
+
+
+def test_read_layout_drops_line_endings_and_comments():
+    lines = ["# a comment\r\n", "XXXX\r\n", "X..X\n", "# another\n", "XXXX"]
+    assert read_layout(lines) == ["XXXX", "X..X", "XXXX"]
+
+
+def test_pack_file_with_comments_and_crlf(tmp_path):
+    layouts = [maze_layouts[0], maze_layouts[3], maze_layouts[1]]
+    lines = ["# maze pack with comments", "# and Windows line endings", ""]
+    for i, maze in enumerate(layouts):
+        lines += [f"# layout {i + 1}"] + maze[:10] + ["# part way through"] + maze[10:] + ["", ""]
+    path = tmp_path / "crlf.txt"
+    path.write_bytes("\r\n".join(lines).encode())
+    places = index_pack_file(path)
+    assert len(places) == 3
+    # comment lines inside a layout are counted and dropped when read
+    assert [count for offset, count in places] == [len(maze) + 1 for maze in layouts]
+    pack = MazePack(path)
+    assert len(pack) == 3 and pack.name == "crlf"
+    for layout, maze in enumerate(layouts):
+        assert pack.read_maze(layout) == maze
+    assert pack.check() == []
+
+
+def test_single_layout_pack_without_final_line_end(tmp_path):
+    path = tmp_path / "one.txt"
+    path.write_text("\n".join(maze_layouts[2]))
+    assert index_pack_file(path) == [(0, len(maze_layouts[2]))]
+    pack = MazePack(path)
+    assert len(pack) == 1
+    assert pack.read_maze(0) == maze_layouts[2]
+    # the one layout is played on every level
+    assert [pack.layout_for_level(level) for level in (1, 2, 3)] == [0, 0, 0]
+
+
+def test_directory_pack_in_file_name_order(tmp_path):
+    for name, maze in (("b.txt", maze_layouts[1]), ("a.txt", maze_layouts[0]), ("c.txt", maze_layouts[2])):
+        (tmp_path / name).write_text("# one layout a file\n" + "\n".join(maze) + "\n")
+    (tmp_path / "notes.md").write_text("not a layout")
+    pack = MazePack(tmp_path)
+    assert len(pack) == 3
+    assert [pack.read_maze(layout) for layout in range(3)] == maze_layouts[:3]
+
+
+def test_empty_pack(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_text("# nothing here\n\n")
+    with pytest.raises(MazeError):
+        MazePack(path)
+
+
+def test_prefetch_only_compiles_the_layout(tmp_path):
+    pack = MazePack(write_pack(tmp_path / "pack.txt", maze_layouts[:3]))
+    images = dict(assets.converted_images)
+    pack.prefetch(1)
+    level = pack.level(1)
+    assert level.maze == maze_layouts[1]
+    assert level.nav.walkable == NavGraph(maze_layouts[1]).walkable
+    # no images are loaded off the display thread
+    assert assets.converted_images == images
+    # the walls are drawn on the display thread when the level is first shown
+    assert level.background is None
+    background = pack.get_background(level)
+    assert background.get_size() == (WIDTH, HEIGHT)
+    assert pack.get_background(level) is background
+
+
+def test_check_lists_the_bad_layouts(tmp_path):
+    pack = MazePack(write_pack(tmp_path / "pack.txt", [maze_layouts[0], bad_layout(), maze_layouts[2]]))
+    errors = pack.check()
+    assert [str(error) for error in errors] == ["pack layout 2: row 5 has 27 columns - 28 expected"]
+
+
+def test_bad_layout_ends_the_game_at_the_level_change(tmp_path):
+    pack = MazePack(write_pack(tmp_path / "pack.txt", [maze_layouts[0], bad_layout()]))
+    game = GameState(maze_pack=pack, sound_on=False)
+    game.new_game(1)
+    game.start_play()
+    assert game.maze_error is None
+    # clear the level and wait for the next maze
+    game.dots.clear_all()
+    for _ in range(END_OF_LEVEL_DELAY + 1):
+        game.update(HOLD)
+    assert game.game_over()
+    assert "pack layout 2" in str(game.maze_error)
+    # another game starts on the first layout again
+    game.new_game(2)
+    assert game.maze_error is None and not game.game_over()
+
+
+def test_bad_first_layout_ends_the_game_at_once(tmp_path):
+    pack = MazePack(write_pack(tmp_path / "pack.txt", [bad_layout()]))
+    game = GameState(maze_pack=pack, sound_on=False)
+    game.new_game(1)
+    assert game.game_over()
+    assert game.maze_error is not None
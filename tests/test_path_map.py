@@ -0,0 +1,126 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+The rules the ghosts find their way by - the tunnel wraps from one side of
+the maze to the other, a target off the maze or in a wall is moved to the
+nearest corridor and a ghost only turns back at a dead end
+"""
+
+import pytest
+from constants import *
+from maze_compiler import compile_maze
+from maze_grids import maze_layouts
+from nav_graph import NavGraph, opposite
+from path_map import PathMap
+from wall_map import X_OFFSET, Y_OFFSET
+
+maze = maze_layouts[0]
+tunnel_row = next(y for y, row in enumerate(maze) if row[0] != "X")
+# screen positions off the maze and the corners of the window
+off_maze_targets = [(-200, -100), (WIDTH + 200, -100), (-200, HEIGHT + 100), (WIDTH + 200, HEIGHT + 100)]
+
+
+def position(col, row):
+    # screen position of the grid cell
+    return col * GRID_WIDTH + X_OFFSET, row * GRID_WIDTH + Y_OFFSET
+
+
+def cell(nav, index):
+    return index % nav.columns, index // nav.columns
+
+
+def blocked(maze, col, row):
+    # copy of the layout with a wall at the cell
+    rows = list(maze)
+    rows[row] = rows[row][:col] + "X" + rows[row][col + 1:]
+    return rows
+
+
+@pytest.mark.parametrize("nav", [
+    lambda: NavGraph(maze),
+    lambda: NavGraph(compiled=compile_maze(maze, 0, False))
+], ids=["find_neighbours", "exit_neighbours"])
+def test_tunnel_wraps(nav):
+    nav = nav()
+    last = nav.columns - 1
+    left_end = tunnel_row * nav.columns
+    right_end = left_end + last
+    assert (LEFT, right_end) in nav.neighbours[left_end]
+    assert (RIGHT, left_end) in nav.neighbours[right_end]
+    # the ends of the tunnel are in the same region as the rest of the maze
+    player = next((x, y) for y, row in enumerate(maze) for x, c in enumerate(row) if c == "Y")
+    assert nav.region[left_end] == nav.region[right_end] == nav.region[player[1] * nav.columns + player[0]]
+
+
+def test_compiled_neighbours_match():
+    nav = NavGraph(maze)
+    compiled = NavGraph(compiled=compile_maze(maze, 0, False))
+    assert compiled.neighbours == nav.neighbours
+    assert compiled.junction == nav.junction
+
+
+def test_route_through_the_tunnel():
+    path_map = PathMap(NavGraph(maze))
+    last = path_map.columns - 1
+    # the shortest way to the far end of the tunnel is back through the wrap
+    assert path_map.direction_to(*position(0, tunnel_row), position(last, tunnel_row), HOLD) == LEFT
+    assert path_map.direction_to(*position(last, tunnel_row), position(0, tunnel_row), HOLD) == RIGHT
+
+
+def test_targets_off_the_maze_move_to_the_nearest_corridor():
+    nav = NavGraph(maze)
+    path_map = PathMap(nav)
+    for index, nearest in enumerate(path_map.nearest):
+        assert path_map.open[nearest]
+        if path_map.open[index]:
+            assert nearest == index
+        else:
+            col, row = cell(nav, index)
+            near_col, near_row = cell(nav, nearest)
+            # no open cell is closer
+            distance = abs(col - near_col) + abs(row - near_row)
+            assert all(abs(col - open_col) + abs(row - open_row) >= distance
+                       for open_col, open_row in (cell(nav, i) for i in range(len(nav.walkable)) if nav.walkable[i]))
+    for target in off_maze_targets:
+        nearest = path_map.nearest[path_map.cell_index(*target)]
+        for junction in nav.junctions:
+            if nav.region[junction] != nav.region[nearest]:
+                continue
+            x, y = position(*cell(nav, junction))
+            # a target off the maze is the same as the nearest corridor cell
+            way = path_map.direction_to(x, y, target, HOLD)
+            assert way is not None
+            assert way == path_map.direction_to(x, y, position(*cell(nav, nearest)), HOLD)
+
+
+def test_only_turns_back_at_a_dead_end():
+    nav = NavGraph(maze)
+    targets = off_maze_targets + [position(*cell(nav, index)) for index in nav.junctions[::7]]
+    path_map = PathMap(nav)
+    for index in range(len(nav.walkable)):
+        if not nav.walkable[index] or len(nav.neighbours[index]) < 2:
+            continue
+        x, y = position(*cell(nav, index))
+        for direction, next_index in nav.neighbours[index]:
+            # arrived in the cell moving in the opposite direction to one of its exits
+            arrived = opposite[direction]
+            for target in targets:
+                way = path_map.direction_to(x, y, target, arrived)
+                if way is not None:
+                    assert way != opposite[arrived]
+
+
+def test_turns_back_at_a_dead_end():
+    nav = NavGraph(maze)
+    # a cell in a straight corridor with the cell to its left also in the corridor
+    index = next(index for index in range(len(nav.walkable))
+                 if nav.neighbours[index] == [(LEFT, index - 1), (RIGHT, index + 1)]
+                 and nav.neighbours[index - 1] == [(LEFT, index - 2), (RIGHT, index)])
+    col, row = cell(nav, index)
+    # wall off the cell so the cell to its left is a dead end
+    dead_end_nav = NavGraph(blocked(maze, col, row))
+    assert dead_end_nav.neighbours[index - 1] == [(LEFT, index - 2)]
+    assert dead_end_nav.junction[index - 1]
+    path_map = PathMap(dead_end_nav)
+    for target in off_maze_targets + [position(col + 1, row)]:
+        assert path_map.direction_to(*position(col - 1, row), target, RIGHT) == LEFT
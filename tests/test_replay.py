@@ -0,0 +1,93 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Recorded games saved and loaded as replay files play back to the same result
+"""
+
+from constants import *
+from episode_runner import run_episode
+from game_state import GameState
+from maze_grids import maze_layouts
+from maze_pack import MazePack
+from policies import GreedyPolicy
+from replay import Replay
+from replay_player import check_replay
+
+seed = 321
+frames = 3000
+
+
+def record_game(pack=None):
+    # A seeded game played by GreedyPolicy recorded as main.py records a game
+    maze_pack = MazePack(pack) if pack is not None else None
+    game = GameState(maze_pack=maze_pack, sound_on=False)
+    game.new_game(seed)
+    game.start_play()
+    player = GreedyPolicy(seed)
+    recording = Replay(game.seed, pack)
+    for _ in range(frames):
+        direction = player.next_direction(game)
+        recording.record(direction)
+        game.update(direction)
+    recording.finish(game)
+    return recording
+
+
+def test_run_length_encoding_round_trip(tmp_path):
+    directions = [HOLD] * 3 + [LEFT] * 40 + [UP] + [RIGHT] * 2 + [DOWN] * 120 + [HOLD] + [LEFT]
+    replay = Replay(7)
+    for direction in directions:
+        replay.record(direction)
+    assert replay.runs == [[HOLD, 3], [LEFT, 40], [UP, 1], [RIGHT, 2], [DOWN, 120], [HOLD, 1], [LEFT, 1]]
+    replay.save(tmp_path / "runs.replay")
+    loaded = Replay.load(tmp_path / "runs.replay")
+    assert loaded.seed == 7
+    assert loaded.score is None and loaded.level is None
+    assert loaded.runs == replay.runs
+    assert loaded.frames == len(directions)
+    assert list(loaded.directions()) == directions
+
+
+def test_recorded_game_replays_exactly(tmp_path):
+    recording = record_game()
+    assert recording.score > 0
+    recording.save(tmp_path / "game.replay")
+    replay = Replay.load(tmp_path / "game.replay")
+    assert (replay.seed, replay.score, replay.level, replay.frames) == \
+        (seed, recording.score, recording.level, frames)
+    assert check_replay(replay)
+    # a different game gives a different result
+    replay.seed += 1
+    assert not check_replay(replay)
+
+
+def test_episode_runner_plays_replay_with_its_seed():
+    recording = record_game()
+    # the episode seed is ignored - the replay is played in the game it was recorded in
+    result = run_episode(0, "replay", frames, recording)
+    assert result["seed"] == seed
+    assert (result["score"], result["level"]) == (recording.score, recording.level)
+
+
+def test_replay_plays_the_recorded_maze_pack(tmp_path):
+    # the built in layouts in reverse order - a different first maze
+    pack = tmp_path / "reversed.txt"
+    pack.write_text("\n\n".join("\n".join(maze) for maze in reversed(maze_layouts)) + "\n")
+    recording = record_game(str(pack))
+    recording.save(tmp_path / "pack.replay")
+    replay = Replay.load(tmp_path / "pack.replay")
+    assert replay.pack == str(pack)
+    assert check_replay(replay)
+    result = run_episode(0, "replay", frames, replay)
+    assert (result["score"], result["level"]) == (recording.score, recording.level)
+    # played on the built in layouts it is a different game
+    replay.pack = None
+    assert not check_replay(replay)
+
+
+def test_version_1_replay_loads(tmp_path):
+    # files saved before the pack was recorded
+    (tmp_path / "old.replay").write_text("maze-man replay 1\nseed 5\nscore 120 level 1 frames 30\nL20 .10\n")
+    replay = Replay.load(tmp_path / "old.replay")
+    assert (replay.seed, replay.pack, replay.score, replay.level, replay.frames) == (5, None, 120, 1, 30)
+    assert replay.runs == [[LEFT, 20], [HOLD, 10]]
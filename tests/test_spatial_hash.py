@@ -0,0 +1,106 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+SpatialHash finds the same collisions as testing every sprite against every other
+"""
+
+import random
+import pytest
+from constants import *
+from ghost import Ghost, BLINKY
+import spatial_hash
+from spatial_hash import SpatialHash
+
+# sprite counts tested one against another and held in cells
+sprite_counts = [2, spatial_hash.direct_count, spatial_hash.direct_count + 1, 60]
+
+
+def scattered_sprites(rng, count):
+    # Ghosts at random pixel positions across the maze - and off the left edge in the tunnel
+    sprites = []
+    for _ in range(count):
+        sprite = Ghost(BLINKY, 1, 1)
+        sprite.x = rng.uniform(-3 * GRID_WIDTH, WIDTH)
+        sprite.y = rng.uniform(0, 8 * GRID_WIDTH)
+        sprites.append(sprite)
+    return sprites
+
+
+def new_hash(sprites):
+    sprite_hash = SpatialHash(GRID_WIDTH)
+    for sprite in sprites:
+        sprite_hash.add(sprite)
+    return sprite_hash
+
+
+def brute_collisions(sprites, sprite):
+    return [other for other in sprites if other is not sprite and sprite.collide_rect(other)]
+
+
+def brute_pairs(sprites):
+    return [(first, second) for n, first in enumerate(sprites) for second in sprites[n + 1:]
+            if first.collide_rect(second)]
+
+
+@pytest.mark.parametrize("count", sprite_counts)
+def test_collisions_match_brute_force(count):
+    rng = random.Random(count)
+    sprites = scattered_sprites(rng, count)
+    sprite_hash = new_hash(sprites)
+    for sprite in sprites:
+        assert sprite_hash.collisions(sprite) == brute_collisions(sprites, sprite)
+    # a sprite not in the hash
+    for probe in scattered_sprites(rng, 20):
+        assert sprite_hash.collisions(probe) == brute_collisions(sprites, probe)
+
+
+@pytest.mark.parametrize("count", sprite_counts)
+def test_pairs_match_brute_force(count):
+    sprites = scattered_sprites(random.Random(count), count)
+    sprite_hash = new_hash(sprites)
+    found = sprite_hash.pairs()
+    assert found == brute_pairs(sprites)
+    if count == 60:
+        # enough sprites that some collide
+        assert found
+
+
+@pytest.mark.parametrize("count", sprite_counts)
+def test_move_across_cell_edges(count):
+    # Sprites walk left from the maze out past x = 0 and back - crossing cell edges either side of 0
+    rng = random.Random(count)
+    sprites = scattered_sprites(rng, count)
+    for sprite in sprites:
+        sprite.x = rng.uniform(-GRID_WIDTH, 2 * GRID_WIDTH)
+        sprite.y = rng.choice([GRID_WIDTH, GRID_WIDTH * 1.5])
+    sprite_hash = new_hash(sprites)
+    for step in [-3] * 40 + [3] * 40:
+        for sprite in sprites[1:]:
+            sprite.x += step * rng.random()
+        sprite_hash.move_all(sprites[1:])
+        sprites[0].x -= step
+        sprite_hash.move(sprites[0])
+        assert sprite_hash.collisions(sprites[0]) == brute_collisions(sprites, sprites[0])
+        assert sprite_hash.pairs() == brute_pairs(sprites)
+
+
+def test_add_and_remove_past_direct_count():
+    # Sprites are put in cells once there are more than direct_count and taken out again
+    sprites = scattered_sprites(random.Random(3), spatial_hash.direct_count + 3)
+    sprite_hash = new_hash(sprites[:spatial_hash.direct_count])
+    assert not sprite_hash.cells
+    for sprite in sprites[spatial_hash.direct_count:]:
+        sprite_hash.add(sprite)
+    assert sprite_hash.cells
+    for sprite in sprites[1:4]:
+        sprite_hash.remove(sprite)
+    held = sprites[:1] + sprites[4:]
+    assert not sprite_hash.cells
+    for sprite in held:
+        assert sprite_hash.collisions(sprite) == brute_collisions(held, sprite)
+
+
+def test_sprite_larger_than_cell():
+    sprite_hash = SpatialHash(GRID_WIDTH // 2)
+    with pytest.raises(ValueError):
+        sprite_hash.add(Ghost(BLINKY, 1, 1))
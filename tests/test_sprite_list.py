@@ -0,0 +1,101 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+SpriteList.clear_done compared with the remove while iterating version it
+replaced - which skipped the item after each one removed so consecutive
+done items took more than one call to clear
+"""
+
+import pytest
+from dot import Dot, DOT, ENERGISER, FRUIT
+from sprite_list import SpriteList
+
+
+def old_clear_done(items):
+    # clear_done before it was replaced
+    for item in items:
+        if item.done:
+            items.remove(item)
+
+
+def old_clear_until_done(items):
+    # call the old version until it removes nothing more
+    while True:
+        count = len(items)
+        old_clear_done(items)
+        if len(items) == count:
+            return
+
+
+def make_dots(kind, done):
+    # a Dot of the kind for each flag in done - done set as given
+    dots = []
+    for i, flag in enumerate(done):
+        if kind == FRUIT:
+            dot = Dot(FRUIT, i, 1, i % 7 + 1)
+        else:
+            dot = Dot(DOT if i % 5 else ENERGISER, i % 28, i // 28)
+        dot.done = flag
+        dots.append(dot)
+    return dots
+
+
+def make_list(items):
+    sprites = SpriteList()
+    for item in items:
+        sprites.add(item)
+    return sprites
+
+
+@pytest.mark.parametrize("kind", [DOT, FRUIT])
+def test_none_done(kind):
+    items = make_dots(kind, [False] * 10)
+    sprites = make_list(items)
+    sprites.clear_done()
+    expected = list(items)
+    old_clear_done(expected)
+    assert sprites.items == expected == items
+
+
+@pytest.mark.parametrize("kind", [DOT, FRUIT])
+def test_separate_done_items_match_one_old_call(kind):
+    # with no two done items together the old version removed them all in one call
+    items = make_dots(kind, [i % 3 == 1 for i in range(12)])
+    sprites = make_list(items)
+    sprites.clear_done()
+    expected = list(items)
+    old_clear_done(expected)
+    assert sprites.items == expected
+
+
+@pytest.mark.parametrize("kind", [DOT, FRUIT])
+def test_consecutive_done_items(kind):
+    items = make_dots(kind, [False, True, True, True, False, True, True, False])
+    # the old version skips items so leaves some done items after one call
+    once = list(items)
+    old_clear_done(once)
+    assert any(item.done for item in once)
+    sprites = make_list(items)
+    sprites.clear_done()
+    assert not any(item.done for item in sprites)
+    expected = list(items)
+    old_clear_until_done(expected)
+    assert sprites.items == expected
+
+
+@pytest.mark.parametrize("kind", [DOT, FRUIT])
+def test_all_done(kind):
+    sprites = make_list(make_dots(kind, [True] * 9))
+    sprites.clear_done()
+    assert sprites.items == []
+    assert len(sprites) == 0
+
+
+@pytest.mark.parametrize("kind", [DOT, FRUIT])
+def test_draw_order_kept(kind):
+    done = [i % 4 == 0 or i % 7 == 0 for i in range(30)]
+    items = make_dots(kind, done)
+    sprites = make_list(items)
+    sprites.clear_done()
+    assert sprites.items == [item for item in items if not item.done]
+    assert list(sprites) == sprites.items
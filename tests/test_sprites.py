@@ -0,0 +1,110 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+Sprites held in slots and the dots held as bitboards behave as the one
+object per dot version they replaced
+"""
+
+import pytest
+from brick import Brick
+from constants import *
+from dot import Dot, DOT, ENERGISER, FRUIT
+from dot_grid import DotGrid
+from game_state import GameState
+from ghost import Ghost, BLINKY, CLYDE
+from level_template import LevelTemplate
+from maze_grids import maze_layouts
+from pac_man import PacMan
+from policies import GreedyPolicy, RandomPolicy
+
+# (frame, score, level, lives) every 1000 frames of seeded games with 50 lives
+# recorded before the sprites had slots and the dots were held as bitboards
+recorded_traces = {
+    (GreedyPolicy, 2024): [(1000, 1770, 1, 48), (2000, 3620, 1, 47), (3000, 5030, 1, 45),
+                           (4000, 7240, 2, 45), (5000, 9770, 2, 44), (6000, 11710, 3, 43)],
+    (RandomPolicy, 7): [(1000, 1050, 1, 49), (2000, 1550, 1, 47), (3000, 1670, 1, 45),
+                        (4000, 2150, 1, 43), (5000, 2290, 1, 42), (6000, 2290, 1, 42)]
+}
+
+
+@pytest.mark.parametrize("sprite", [
+    lambda: PacMan(13, 23),
+    lambda: Ghost(BLINKY, 13, 11),
+    lambda: Ghost(CLYDE, 15, 14),
+    lambda: Dot(DOT, 1, 1),
+    lambda: Dot(FRUIT, 13, 17, 3),
+    lambda: Brick(0, 0, 0)
+])
+def test_sprites_have_no_dict(sprite):
+    sprite = sprite()
+    assert not hasattr(sprite, "__dict__")
+    with pytest.raises(AttributeError):
+        sprite.not_a_slot = 1
+
+
+def reference_dots(maze):
+    # a Dot for each dot and energiser as the game held them before DotGrid
+    dots = []
+    for y, row in enumerate(maze):
+        for x, char in enumerate(row):
+            if char == ".":
+                dots.append(Dot(DOT, x, y))
+            elif char == "E":
+                dots.append(Dot(ENERGISER, x, y))
+    return dots
+
+
+def walkable_centres(maze):
+    for y, row in enumerate(maze):
+        for x, char in enumerate(row):
+            if char != "X" and char != "O":
+                yield x * GRID_WIDTH + 20, y * GRID_WIDTH + 40
+
+
+@pytest.mark.parametrize("layout", range(len(maze_layouts)))
+def test_dot_grid_matches_dot_list(layout):
+    maze = maze_layouts[layout]
+    grid = DotGrid()
+    grid.set_dots(LevelTemplate(maze))
+    dots = reference_dots(maze)
+    fruit = Dot(FRUIT, 13, 17, 1)
+    grid.add(fruit)
+    dots.append(fruit)
+    assert grid.number() == len(dots)
+    pacman = PacMan(13, 23)
+    # sweep pacman through the maze eating as it goes - on the cell centres and part way between
+    for x, y in walkable_centres(maze):
+        for offset_x, offset_y in ((0, 0), (7, 0), (0, -9), (-13, 0)):
+            pacman.x = x + offset_x
+            pacman.y = y + offset_y
+            hits = list(grid.collisions(pacman))
+            expected = [dot for dot in dots if pacman.collide_rect(dot)]
+            assert [(hit.dtype, hit.cell) for hit in hits] == [(dot.dtype, dot.cell) for dot in expected]
+            for hit, dot in zip(hits, expected):
+                grid.remove(hit)
+                dots.remove(dot)
+            # fruit eaten or timed out is deleted at the start of the next frame
+            grid.clear_done()
+            dots = [dot for dot in dots if not dot.done]
+            assert grid.number() == len(dots)
+    remaining = {dot.cell for dot in dots if dot.dtype != FRUIT}
+    for y, row in enumerate(maze):
+        for x in range(len(row)):
+            assert ((x, y) in grid) == ((x, y) in remaining)
+
+
+@pytest.mark.parametrize("policy, seed", list(recorded_traces))
+def test_seeded_game_matches_recorded_trace(policy, seed):
+    game = GameState(sound_on=False)
+    game.new_game(seed)
+    game.start_play()
+    game.score_board.lives = 50
+    player = policy(seed)
+    trace = []
+    for frame in range(1, 6001):
+        game.update(player.next_direction(game))
+        game.score_board.update()
+        if frame % 1000 == 0:
+            score_board = game.score_board
+            trace.append((frame, score_board.score, score_board.level, score_board.lives))
+    assert trace == recorded_traces[(policy, seed)]
@@ -0,0 +1,74 @@
+"""
+Author Paul Brace April 2024
+PacMan game developed using PyGame
+WallMap class - grid index of the maze walls used for collision tests
+"""
+
+from constants import GRID_WIDTH
+
+# Screen position of the center of grid cell (0, 0)
+X_OFFSET = 20
+Y_OFFSET = 40
+
+
+def cell_span(pos, reach, offset):
+    # Return the range of grid cells whose center could be within reach of pos
+    # (cells may need an exact test as the range includes the boundary cells)
+    first = int((abs(pos) - reach - offset) // GRID_WIDTH)
+    last = int((abs(pos) + reach - offset) // GRID_WIDTH) + 1
+    return range(first, last + 1)
+
+
+class WallMap:
+    # One byte per grid cell, set to 1 where there is a wall or the pen opening
+    def __init__(self):
+        self.columns = 0
+        self.rows = 0
+        self.cells = bytearray()
+
+    def build(self, maze):
+        # Compile the maze layout strings into the occupancy index
+        self.rows = len(maze)
+        self.columns = max(len(row) for row in maze)
+        self.cells = bytearray(self.columns * self.rows)
+        for y, row in enumerate(maze):
+            for x, char in enumerate(row):
+                if char == "X" or char == "O":
+                    self.cells[y * self.columns + x] = 1
+
+    def clear(self):
+        self.columns = 0
+        self.rows = 0
+        self.cells = bytearray()
+
+    def is_wall(self, col, row):
+        # cells outside the maze (e.g. the tunnel exits) are always open
+        if 0 <= col < self.columns and 0 <= row < self.rows:
+            return self.cells[row * self.columns + col] == 1
+        return False
+
+    def find_collision(self, game_object):
+        """
+        :param game_object: GameSprite to test
+        :return: (x, y) center of the first wall the object overlaps or None.
+        Walls are tested row by row, left to right, the same order the bricks
+        are created in, so the result matches a scan of every Brick
+        """
+        x = abs(game_object.x)
+        y = abs(game_object.y)
+        reach_x = game_object.width / 2 + GRID_WIDTH / 2
+        reach_y = game_object.height / 2 + GRID_WIDTH / 2
+        cols = cell_span(x, reach_x, X_OFFSET)
+        for row in cell_span(y, reach_y, Y_OFFSET):
+            if row < 0 or row >= self.rows:
+                continue
+            wall_y = row * GRID_WIDTH + Y_OFFSET
+            if abs(y - wall_y) >= reach_y:
+                continue
+            offset = row * self.columns
+            for col in cols:
+                if 0 <= col < self.columns and self.cells[offset + col]:
+                    wall_x = col * GRID_WIDTH + X_OFFSET
+                    if abs(x - wall_x) < reach_x:
+                        return wall_x, wall_y
+        return None